@@ -5,13 +5,24 @@ import matplotlib.pyplot as plt
 
 from src.loader import download_prices
 from src.coint import find_cointegrated_pairs
-from src.alpaca_loader import fetch_historical_data
-from src.strategy import compute_spread, generate_signals
-from src.backtest import backtest_pair, compute_metrics
+from src.alpaca_loader import fetch_session_bars
+from src.execution import ExecutionSimulator
+from src.robustness import bootstrap_universe
 from src.config import load_config
 from src.export import save_trade_log, save_full_results, save_summary_table
-from src.features import extract_features
-from ml.supervised_model import predict_success
+from src.pipeline import evaluate_pairs
+from src.chunked import write_price_store
+from src.strategy import compute_spread
+from src.backtest import backtest_threshold_grid
+from src.pair_index import PairStatsIndex
+from src.executors import make_executor
+from src.registry import RunRegistry, StageTimer, run_key, code_version, file_fingerprints
+from src.risk import risk_report, unit_notional
+from src.router import OrderRouter, MockBroker, AlpacaBroker, net_leg_targets
+from src.sessions import (
+    bar_minutes, validate_bar_size, effective_freq, periods_per_year, window_bars, align_prices
+)
+from ml.supervised_model import predict_success, GLOBAL_MODEL_PATH, REGIME_MODEL_TEMPLATE
 from ml.clustering import cluster_features
 
 if __name__ == "__main__":
@@ -19,28 +30,71 @@ if __name__ == "__main__":
     parser.add_argument("--config", type=str, default="config.json", help="Path to experiment config JSON")
     parser.add_argument("--data_source", type=str, choices=["yfinance", "alpaca"],
                         help="Override data source (yfinance or alpaca)")
+    parser.add_argument("--rerun", action="store_true",
+                        help="Recompute even if an identical run is in the registry")
+    parser.add_argument("--list_runs", action="store_true", help="List registered runs and exit")
+    parser.add_argument("--diff", nargs=2, metavar=("RUN_A", "RUN_B"),
+                        help="Compare two registered runs per pair and exit")
     args = parser.parse_args()
     config = load_config(args.config, override_source=args.data_source)
 
+    registry_cfg = config.get("registry", {})
+    registry = RunRegistry(registry_cfg.get("root", "runs"))
+
+    if args.list_runs:
+        print(registry.list_runs().to_string(index=False))
+        exit()
+
+    if args.diff:
+        run_a, run_b = args.diff
+        print("\n[Config Diff]")
+        for key, (value_a, value_b) in registry.config_diff(run_a, run_b).items():
+            print(f"  {key}: {value_a} -> {value_b}")
+        print("\n[Metric Diff]")
+        print(registry.diff(run_a, run_b).to_string(index=False))
+        exit()
+
+    timer = StageTimer()
+
     tickers = config.get("tickers", [])
     data_source = config.get("data_source", "yfinance").lower()
+    timeframe = config.get("timeframe", "day")
+    # Same rule as effective_freq: only Alpaca delivers intraday bars
+    intraday = data_source == "alpaca" and bar_minutes(timeframe) is not None
+    if intraday and config.get("bar_size"):
+        # Fail before fetching rather than inside resample_bars
+        validate_bar_size(timeframe, config["bar_size"])
+    open_df = None
+    volume_df = None
 
     if data_source == "alpaca":
         print("[Data Source] Using Alpaca API...")
         dfs = []
+        opens = []
+        volumes = []
         for ticker in tickers:
-            df = fetch_historical_data(ticker, days=config.get("days", 90), timeframe=config.get("timeframe", "day"))
+            # In-session bars at the target size, ready to align
+            df = fetch_session_bars(ticker, days=config.get("days", 90), timeframe=timeframe,
+                                    bar_size=config.get("bar_size"))
             if df.empty:
                 print(f"[Warning] No data for {ticker}. Skipping.")
             else:
-                df.set_index("datetime", inplace=True)
                 dfs.append(df["close"].rename(ticker))
+                opens.append(df["open"].rename(ticker))
+                volumes.append(df["volume"].rename(ticker))
 
         if not dfs:
             print("[Error] No valid data returned from Alpaca.")
             exit()
         
-        df = pd.concat(dfs, axis=1)
+        if intraday:
+            df = align_prices(dfs, max_gap_bars=config.get("max_gap_bars", 5))
+            open_df = pd.concat(opens, axis=1).reindex(df.index)
+            volume_df = pd.concat(volumes, axis=1).reindex(df.index).fillna(0)
+        else:
+            df = pd.concat(dfs, axis=1)
+            open_df = pd.concat(opens, axis=1)
+            volume_df = pd.concat(volumes, axis=1)
     else:
         print("[Data Source] Using yfinance...")
         df = download_prices(tickers)
@@ -52,8 +106,60 @@ if __name__ == "__main__":
     if df.empty:
         print("Price data download failed. Please check ticker list or internet connection.")
         exit()
+    timer.lap("data")
+
+    # Identical config, data, code and model/index files: serve the stored results
+    code = code_version()
+    input_files = [GLOBAL_MODEL_PATH] + [
+        REGIME_MODEL_TEMPLATE.format(regime) for regime in range(config.get("regime_count", 3))
+    ]
+    if config.get("pair_index", {}).get("enabled", False):
+        index_path = config["pair_index"].get("path", "results/pair_index.csv")
+        input_files += [index_path, f"{index_path}.sums.npz"]
+    inputs = file_fingerprints(input_files)
+    key = run_key(config, df, code, inputs)
+    use_registry = registry_cfg.get("enabled", False)
+    paper_cfg = config.get("paper_trading", {})
+    if use_registry and code is None:
+        print("[Registry] Code version unknown (not a git checkout); stored runs will not be served.")
+    # Order routing is a side effect, so paper-trading runs are never served from the registry
+    if use_registry and code is not None and registry.exists(key) and not args.rerun \
+            and not paper_cfg.get("enabled", False):
+        manifest = registry.restore(key)
+        print(f"[Registry] Run {key} already computed on {manifest['created']}; serving stored results.")
+        cached = registry.summary(key)
+        print("\nTop Strategies:")
+        print(cached.head(config.get("top_n", 3))[["Pair", "Sharpe Ratio", "CAGR (%)", "Max Drawdown", "Total Return (%)"]])
+        exit()
+
+    # Backend for per-pair work: local pool by default, or the "executor" block (serial/thread/process/queue)
+    executor = make_executor(config)
 
-    coint_pairs = find_cointegrated_pairs(df, significance=config.get("significance", 0.1))
+    # Persistent pair statistics, updated with any bars not yet indexed
+    pair_index = None
+    index_cfg = config.get("pair_index", {})
+    if index_cfg.get("enabled", False):
+        pair_index = PairStatsIndex(index_cfg.get("path", "results/pair_index.csv")).update(
+            df,
+            sectors=index_cfg.get("sectors", {}),
+            refit_every=index_cfg.get("refit_every", 20),
+            min_correlation=index_cfg.get("min_correlation", 0.0),
+            n_jobs=config.get("n_jobs", 1),
+            executor=executor
+        )
+        pair_index.save()
+
+    coint_pairs = find_cointegrated_pairs(
+        df,
+        significance=config.get("significance", 0.1),
+        correction=config.get("pvalue_correction", None),
+        holdout=config.get("holdout_fraction", 0.0),
+        top_k=config.get("pair_budget", None),
+        n_jobs=config.get("n_jobs", 1),
+        pair_index=pair_index,
+        executor=executor
+    )
+    timer.lap("pair_scan")
     print("\nCointegrated Pairs:")
     for pair in coint_pairs:
         print(pair)
@@ -62,56 +168,184 @@ if __name__ == "__main__":
         print("\nNo cointegrated pairs found. Try adjusting threshold or ticker set.")
         exit()
 
+    execution = ExecutionSimulator.from_config(
+        config.get("execution"),
+        slippage_pct=config.get("slippage", 0.0005),
+        transaction_cost_pct=config.get("txn_cost", 0.001)
+    )
+    if execution is not None and open_df is None and execution.fill_at == "open":
+        print("[Warning] Open prices unavailable for this data source. Simulating fills at close.")
+        execution.fill_at = "close"
+
     results_list = []
+    pair_names = []
     summary_rows = []
     feature_rows = []
 
-    for A, B, pval in coint_pairs:
-        try:
-            series_A = df[A]
-            series_B = df[B]
-            spread, beta = compute_spread(series_A, series_B)
-            signals = generate_signals(spread)
+    # Out-of-core backtests: pairs stream from an on-disk copy of the loaded prices to
+    # results/ and logs/, so no per-bar results are kept for the stages that need them
+    chunked_cfg = config.get("chunked", {})
+    streamed = chunked_cfg.get("enabled", False)
+    if streamed:
+        write_price_store(df, chunked_cfg.get("path", "data/price_store.npy"))
+        skipped = [name for name in ("paper_trading", "bootstrap", "risk")
+                   if config.get(name, {}).get("enabled", False)]
+        if skipped:
+            print(f"[Warning] Chunked backtests keep no per-bar results; skipping {', '.join(skipped)}.")
+
+    n_jobs = config.get("n_jobs", 1)
+    evaluated = evaluate_pairs(df, coint_pairs, config, execution=execution,
+                               open_df=open_df, volume_df=volume_df, n_jobs=n_jobs,
+                               pair_index=pair_index, executor=executor)
+    if executor is not None:
+        executor.close()
+
+    for A, B, output in evaluated:
+        if output is None:
+            continue
+        metrics, features, results = output
+
+        summary_rows.append(metrics)
+        feature_rows.append(features)
+        pair_names.append(f"{A}_{B}")
+        if results is None:
+            # Chunked: results and trade log were already streamed to disk
+            continue
+        results_list.append((f"{A}_{B}", results))
+
+        save_trade_log(results, f"{A}_{B}")
+        save_full_results(results, f"{A}_{B}")
 
-            results = backtest_pair(
-                series_A, series_B, signals, beta,
+    if not summary_rows:
+        print("No backtests succeeded.")
+        exit()
+    timer.lap("backtest")
+
+    # Route the latest target exposures as paper orders, netted per ticker across pairs
+    if paper_cfg.get("enabled", False) and not streamed:
+        legs, exposures = [], []
+        for A, B, output in evaluated:
+            if output is None:
+                continue
+            _, _, results = output
+            # Unrounded hedge ratio (the summary's Beta is rounded for display)
+            _, beta = compute_spread(df[A], df[B])
+            legs.append((A, B, beta))
+            exposures.append(results["Exposure"].iloc[-1])
+        targets = net_leg_targets(
+            exposures, legs,
+            shares_per_unit=paper_cfg.get("shares_per_unit", 100),
+            lot_size=paper_cfg.get("lot_size", 1)
+        )
+
+        if paper_cfg.get("broker", "mock") == "alpaca":
+            broker = AlpacaBroker(paper=True)
+        else:
+            broker = MockBroker(prices=df.iloc[-1].to_dict(), slippage_pct=config.get("slippage", 0.0005))
+        router = OrderRouter(
+            broker,
+            max_concurrency=paper_cfg.get("max_concurrency", 8),
+            min_qty=paper_cfg.get("min_qty", 1),
+            fill_timeout=paper_cfg.get("fill_timeout", 30.0),
+            close_unmanaged=paper_cfg.get("close_unmanaged", False)
+        )
+        router.run_cycle(targets, universe=list(df.columns))
+        router.save_log()
+        print(router.latency_stats())
+        timer.lap("routing")
+
+    # Threshold study: all (entry_z, exit_z) settings per pair from one spread computation
+    threshold_grid = config.get("threshold_grid")
+    if threshold_grid:
+        studies = []
+        for A, B, output in evaluated:
+            if output is None:
+                continue
+            _, beta = compute_spread(df[A], df[B])
+            study = backtest_threshold_grid(
+                df[A], df[B], beta, [tuple(t) for t in threshold_grid],
                 capital_base=config.get("capital", 1_000_000),
                 risk_aversion=config.get("risk_aversion", 1.0),
                 slippage_pct=config.get("slippage", 0.0005),
                 transaction_cost_pct=config.get("txn_cost", 0.001),
                 max_leverage=config.get("max_leverage", 2.0),
-                stop_loss_pct=config.get("stop_loss", None)
+                window=window_bars(config.get("window_days", 20), effective_freq(config)),
+                periods_per_year=periods_per_year(effective_freq(config))
             )
+            study.insert(0, "Pair", f"{A}/{B}")
+            studies.append(study)
+        os.makedirs("results", exist_ok=True)
+        pd.concat(studies).to_csv("results/threshold_study.csv", index=False)
+        print("[Saved] Threshold study to 'results/threshold_study.csv'")
 
-            if not isinstance(results.index, pd.DatetimeIndex):
-                results.index = series_A.index[1:]
-
-            metrics = compute_metrics(results)
-            metrics.update({
-                "Pair": f"{A}/{B}",
-                "Beta": round(beta, 4),
-                "P-Value": round(pval, 4)
-            })
-
-            features = extract_features(series_A, series_B, spread, signals, beta, pval)
-            features["Pair"] = f"{A}/{B}"
-
-            summary_rows.append(metrics)
-            feature_rows.append(features)
-            results_list.append((f"{A}_{B}", results))
+        timer.lap("threshold_study")
 
-            save_trade_log(results, f"{A}_{B}")
-            save_full_results(results, f"{A}_{B}")
+    summary_df = pd.DataFrame(summary_rows)
+    feature_df = pd.DataFrame(feature_rows)
 
-        except Exception as e:
-            print(f"[Error] Backtest failed for pair {A}/{B}: {e}")
+    # Bootstrap confidence intervals for every metric
+    bootstrap_cfg = config.get("bootstrap", {})
+    if bootstrap_cfg.get("enabled", False) and not streamed:
+        print("\n[Bootstrap] Resampling PnL for confidence intervals...")
+        ci_df = bootstrap_universe(
+            {name.replace("_", "/"): res for name, res in results_list},
+            n_jobs=bootstrap_cfg.get("n_jobs", 1),
+            n_resamples=bootstrap_cfg.get("n_resamples", 2000),
+            method=bootstrap_cfg.get("method", "stationary"),
+            block_size=bootstrap_cfg.get("block_size", 20),
+            chunk_size=bootstrap_cfg.get("chunk_size", 250),
+            alpha=bootstrap_cfg.get("alpha", 0.05),
+            periods_per_year=periods_per_year(effective_freq(config))
+        )
+        summary_df = summary_df.merge(ci_df, on="Pair", how="left")
+        timer.lap("bootstrap")
 
-    if not summary_rows:
-        print("No backtests succeeded.")
-        exit()
+    # Rolling risk analytics across all pairs, optionally against factor returns
+    risk_cfg = config.get("risk", {})
+    if risk_cfg.get("enabled", False) and not streamed:
+        factor_returns = None
+        factors = risk_cfg.get("factors", [])
+        if factors:
+            factor_prices = df[[f for f in factors if f in df.columns]]
+            missing = [f for f in factors if f not in df.columns]
+            if missing:
+                if data_source == "alpaca":
+                    # Same session filter, resampling and gap handling as the universe
+                    fetched = []
+                    for ticker in missing:
+                        bars = fetch_session_bars(ticker, days=config.get("days", 90), timeframe=timeframe,
+                                                  bar_size=config.get("bar_size"))
+                        if not bars.empty:
+                            fetched.append(bars["close"].rename(ticker))
+                    if not fetched:
+                        extra = pd.DataFrame()
+                    elif intraday:
+                        extra = align_prices(fetched, max_gap_bars=config.get("max_gap_bars", 5))
+                    else:
+                        extra = pd.concat(fetched, axis=1)
+                else:
+                    extra = download_prices(missing, save=False)
+                if not extra.empty:
+                    extra.index = pd.to_datetime(extra.index)
+                factor_prices = factor_prices.join(extra.reindex(df.index), how="left")
+            factor_returns = factor_prices.pct_change()
 
-    summary_df = pd.DataFrame(summary_rows)
-    feature_df = pd.DataFrame(feature_rows)
+        # Dollar notional of one spread unit, to express turnover as a fraction of capital
+        legs = {
+            f"{A}/{B}": (A, B, compute_spread(df[A], df[B])[1])
+            for A, B, output in evaluated if output is not None
+        }
+        report = risk_report(
+            {name.replace("_", "/"): res for name, res in results_list},
+            factor_returns=factor_returns,
+            window=window_bars(risk_cfg.get("window_days", 63), effective_freq(config)),
+            periods_per_year=periods_per_year(effective_freq(config)),
+            notional=unit_notional(df, legs)
+        )
+        os.makedirs("results", exist_ok=True)
+        report.to_csv("results/risk_report.csv", index=False)
+        print("[Saved] Risk report to 'results/risk_report.csv'")
+        timer.lap("risk")
 
     # Apply clustering
     clustered_df = cluster_features(
@@ -137,7 +371,8 @@ if __name__ == "__main__":
 
     # Sort by ML + Sharpe
     summary_df.sort_values(by=["ML_Predicted_Success_Prob", "Sharpe Ratio"], ascending=False, inplace=True)
-    top_df = summary_df.head(top_n)
+    top_df = summary_df.head(config.get("top_n", 3))
+    timer.lap("ml")
 
     print("\nTop Strategies:")
     print(top_df[["Pair", "Sharpe Ratio", "ML_Predicted_Success_Prob", "CAGR (%)", "Max Drawdown", "Total Return (%)"]])
@@ -158,5 +393,24 @@ if __name__ == "__main__":
     save_summary_table(summary_df, fmt="html")
     feature_df.to_csv("results/features.csv", index=False)
     print("\n[Saved] Strategy features exported to 'results/features.csv'")
+    timer.lap("export")
+
+    if use_registry:
+        artifacts = [
+            "results/strategy_summary.csv",
+            "results/strategy_summary.html",
+            "results/features.csv",
+            "results/threshold_study.csv" if threshold_grid else None,
+            "results/risk_report.csv" if risk_cfg.get("enabled", False) else None,
+        ]
+        for name in pair_names:
+            artifacts += [f"results/{name}_results.csv", f"logs/{name}_trades.csv"]
+        registry.record(
+            key, config, df, [path for path in artifacts if path],
+            timings=timer.timings,
+            metadata={"pairs": len(summary_df), "data_source": data_source},
+            code=code,
+            inputs=inputs
+        )
 
     plt.show()
@@ -8,6 +8,8 @@ from alpaca.data.timeframe import TimeFrame
 from datetime import datetime, timedelta
 import pandas as pd
 
+from src.sessions import bar_minutes, filter_session, resample_bars
+
 # Load environment variables
 load_dotenv()
 
@@ -60,6 +62,30 @@ def fetch_historical_data(symbol: str, days: int = 5, timeframe: str = "day") ->
         print(f"[Error] Failed to fetch data for {symbol}: {e}")
         return pd.DataFrame()
 
+def fetch_session_bars(symbol: str, days: int = 5, timeframe: str = "day", bar_size: str = None) -> pd.DataFrame:
+    """
+    Fetch bars as the pipeline uses them: intraday bars are reduced to the regular
+    session and, if `bar_size` is set, resampled to that size.
+
+    Args:
+        symbol (str): Ticker (e.g., 'AAPL')
+        days (int): Number of days to look back
+        timeframe (str): One of 'minute', 'hour', 'day'
+        bar_size (str): Optional intraday resample target, e.g. '15min'
+
+    Returns:
+        pd.DataFrame: OHLCV indexed by bar time (empty if the fetch failed)
+    """
+    df = fetch_historical_data(symbol, days=days, timeframe=timeframe)
+    if df.empty:
+        return df
+    df = df.set_index("datetime")
+    if bar_minutes(timeframe) is not None:
+        df = filter_session(df[["open", "high", "low", "close", "volume"]])
+        if bar_size:
+            df = resample_bars(df, bar_size)
+    return df
+
 def fetch_latest_trade(symbol: str):
     """
     Fetch the most recent trade for a given stock.
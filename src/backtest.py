@@ -1,6 +1,9 @@
 import numpy as np
 import pandas as pd
 
+from src.kernels import apply_exit_rules
+from src.strategy import hysteresis_signal_grid
+
 def backtest_pair(
     series1, series2, signals, beta, 
     capital_base=1_000_000, 
@@ -8,28 +11,132 @@ def backtest_pair(
     slippage_pct=0.0005,
     transaction_cost_pct=0.001,
     max_leverage=2.0,
-    stop_loss_pct=None
+    stop_loss_pct=None,
+    execution=None,
+    open1=None,
+    open2=None,
+    volume1=None,
+    volume2=None,
+    window=20,
+    trailing_stop_pct=None,
+    max_holding_bars=None,
+    cooldown_bars=0,
+    stop_loss_exit=False
 ):
     """
     Backtest a mean-reversion strategy with execution costs, leverage limits, and trade tagging.
+
+    When an `ExecutionSimulator` is passed as `execution`, the flat per-bar cost is
+    replaced by simulated fills (latency, open/close execution, volume caps, partial
+    fills) driven by the optional leg opens and volumes. `window` is the rolling
+    z-score lookback in bars.
+
+    A `stop_loss_pct` breach only tags the bar as 'StopLoss' unless `stop_loss_exit`
+    is set, in which case it closes the position. Exiting stops, `trailing_stop_pct`,
+    `max_holding_bars` and `cooldown_bars` run on the compiled exit-rule kernel
+    (src.kernels).
     """
     signals = signals[-len(series1):]
     signals = signals.reindex(series1.index)
 
     spread = series1 - beta * series2
-    spread_returns = spread.diff()
 
-    spread_mean = spread.rolling(20).mean()
-    spread_std = spread.rolling(20).std()
+    spread_mean = spread.rolling(window).mean()
+    spread_std = spread.rolling(window).std()
+    zscore, position_size = size_positions(
+        spread, spread_mean, spread_std, spread_std.bfill(), risk_aversion, max_leverage
+    )
+
+    exposure = position_size * signals
+
+    fills = None
+    if execution is not None:
+        spread_open = None
+        if open1 is not None and open2 is not None:
+            spread_open = (open1 - beta * open2).reindex(series1.index)
+        capacity = None
+        if volume1 is not None and volume2 is not None:
+            capacity = execution.capacity(
+                volume1.reindex(series1.index), volume2.reindex(series1.index), beta
+            )
+        fills = execution.simulate(exposure, spread, spread_open, capacity)
+        target_exposure = exposure
+        exposure = pd.Series(fills["Held"].values, index=exposure.index)
+
+    if (stop_loss_pct and stop_loss_exit) or trailing_stop_pct or max_holding_bars or cooldown_bars:
+        if fills is not None:
+            raise ValueError("Exit rules are not supported together with the execution simulator.")
+        ruled = apply_exit_rules(
+            exposure, spread.diff(), capital_base,
+            slippage_pct + transaction_cost_pct,
+            stop_loss_pct if stop_loss_exit else None,
+            trailing_stop_pct, max_holding_bars, cooldown_bars
+        )
+        if stop_loss_pct and not stop_loss_exit:
+            # Tag-only stop-loss, as in run_ledger
+            breached = ruled["PnL"] < -stop_loss_pct * ruled["Capital"].shift(1)
+            ruled.loc[breached & ruled["Event"].isna(), "Event"] = "StopLoss"
+        exposure = ruled["Exposure"]
+        pnl_series = ruled["PnL"].iloc[1:].tolist()
+        capital = ruled["Capital"].iloc[1:].tolist()
+        event_tags = ruled["Event"].iloc[1:].tolist()
+    else:
+        pnl_series, capital, event_tags = run_ledger(
+            spread, exposure, capital_base,
+            slippage_pct, transaction_cost_pct, stop_loss_pct, fills
+        )
+
+    results = pd.DataFrame({
+        "Spread": spread.iloc[1:],
+        "ZScore": zscore.iloc[1:],
+        "Signal": signals.iloc[1:],
+        "PositionSize": position_size.iloc[1:],
+        "Exposure": exposure.iloc[1:],
+        "PnL": pnl_series,
+        "Capital": capital,
+        "Event": event_tags
+    })
+
+    if fills is not None:
+        results["TargetExposure"] = target_exposure.iloc[1:].values
+        results["Filled"] = fills["Filled"].iloc[1:].values
+        results["FillPrice"] = fills["FillPrice"].iloc[1:].values
+        results["ExecCost"] = fills["Cost"].iloc[1:].values
+        results["FillLag"] = fills["FillLag"].iloc[1:].values
+
+    # Ensure datetime index is preserved
+    if isinstance(series1.index, pd.DatetimeIndex):
+        results.index = series1.index[1:]
+    return results
+
+
+def size_positions(spread, spread_mean, spread_std, volatility, risk_aversion, max_leverage):
+    """
+    Rolling z-score and volatility-scaled position size, capped at max_leverage.
+    """
     zscore = (spread - spread_mean) / (spread_std + 1e-6)
-    zscore.fillna(0, inplace=True)
+    zscore = zscore.fillna(0)
 
-    volatility = spread_std.bfill()
     raw_position = (np.abs(zscore) / (volatility + 1e-6)) / risk_aversion
     position_size = raw_position.clip(upper=max_leverage)
+    return zscore, position_size
 
-    exposure = position_size * signals
-    capital = [capital_base]
+
+def run_ledger(
+    spread, exposure, capital_start,
+    slippage_pct, transaction_cost_pct, stop_loss_pct=None, fills=None
+):
+    """
+    Walk bars 1..n-1 accruing PnL, costs and capital, tagging trade events.
+
+    Bar 0 is the state carried in (previous exposure and spread level), so chunked
+    callers can prepend the last bar of the previous chunk.
+
+    Returns:
+        tuple: (pnl list, capital list, event tag list), each of length n-1
+    """
+    spread_returns = spread.diff()
+    capital = [capital_start]
     pnl_series = []
     event_tags = []
 
@@ -38,8 +145,14 @@ def backtest_pair(
         curr_expo = exposure.iloc[i]
         delta_expo = curr_expo - prev_expo
 
-        cost = abs(delta_expo) * (slippage_pct + transaction_cost_pct)
-        pnl = prev_expo * spread_returns.iloc[i] - cost
+        if fills is None:
+            cost = abs(delta_expo) * (slippage_pct + transaction_cost_pct)
+            pnl = prev_expo * spread_returns.iloc[i] - cost
+        else:
+            # Mark the bar's fills from their execution price to the close
+            cost = fills["Cost"].iloc[i]
+            fill_pnl = fills["Filled"].iloc[i] * (spread.iloc[i] - fills["FillPrice"].iloc[i])
+            pnl = prev_expo * spread_returns.iloc[i] + np.nan_to_num(fill_pnl) - cost
         new_capital = capital[-1] + pnl
 
         if prev_expo == 0 and curr_expo != 0:
@@ -55,33 +168,77 @@ def backtest_pair(
         capital.append(new_capital)
         event_tags.append(tag)
 
-    results = pd.DataFrame({
-        "Spread": spread.iloc[1:],
-        "ZScore": zscore.iloc[1:],
-        "Signal": signals.iloc[1:],
-        "PositionSize": position_size.iloc[1:],
-        "Exposure": exposure.iloc[1:],
-        "PnL": pnl_series,
-        "Capital": capital[1:],
-        "Event": event_tags
-    })
+    return pnl_series, capital[1:], event_tags
 
-    # Ensure datetime index is preserved
-    if isinstance(series1.index, pd.DatetimeIndex):
-        results.index = series1.index[1:]
-    return results
 
+def backtest_threshold_grid(
+    series1, series2, beta, thresholds,
+    capital_base=1_000_000,
+    risk_aversion=1.0,
+    slippage_pct=0.0005,
+    transaction_cost_pct=0.001,
+    max_leverage=2.0,
+    window=20,
+    periods_per_year=252
+):
+    """
+    Backtest many (entry_z, exit_z) hysteresis settings for one pair at once.
 
-def compute_metrics(results):
+    The spread, z-scores and position sizes are computed once; signals, exposure,
+    PnL and capital are (settings x bars) arrays, using the same flat cost model
+    as backtest_pair.
+
+    Returns:
+        pd.DataFrame: One row of metrics per setting, sorted by Sharpe Ratio
+    """
+    spread = series1 - beta * series2
+    values = spread.to_numpy(dtype=float)
+    signal_z = (values - np.mean(values)) / np.std(values)
+    signals = hysteresis_signal_grid(signal_z, thresholds)
+
+    spread_mean = spread.rolling(window).mean()
+    spread_std = spread.rolling(window).std()
+    _, position_size = size_positions(
+        spread, spread_mean, spread_std, spread_std.bfill(), risk_aversion, max_leverage
+    )
+    exposure = position_size.to_numpy()[None, :] * signals
+
+    prev = exposure[:, :-1]
+    curr = exposure[:, 1:]
+    cost = np.abs(curr - prev) * (slippage_pct + transaction_cost_pct)
+    pnl = prev * np.diff(values)[None, :] - cost
+    capital = capital_base + np.cumsum(pnl, axis=1)
+
+    std = pnl.std(axis=1, ddof=1)
+    sharpe = np.divide(pnl.mean(axis=1), std, out=np.zeros(len(std)), where=std > 0) * np.sqrt(periods_per_year)
+    drawdown = (np.maximum.accumulate(capital, axis=1) - capital).max(axis=1)
+    trades = (((prev == 0) & (curr != 0)) | ((prev != 0) & (curr == 0))).sum(axis=1)
+
+    study = pd.DataFrame({
+        "Entry Z": [t[0] for t in thresholds],
+        "Exit Z": [t[1] for t in thresholds],
+        "Sharpe Ratio": np.round(sharpe, 4),
+        "Max Drawdown": np.round(drawdown, 4),
+        "Trade Count": trades.astype(int),
+        "Total Return (%)": np.round((capital[:, -1] / capital[:, 0] - 1) * 100, 2),
+        "Exposure Time (%)": np.round((np.abs(curr) > 0).mean(axis=1) * 100, 2)
+    })
+    return study.sort_values("Sharpe Ratio", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def compute_metrics(results, periods_per_year=252):
 
     """
     Compute performance metrics from backtest results.
+
+    `periods_per_year` is the number of bars per year used to annualize Sharpe
+    (252 for daily bars; see src.sessions.periods_per_year for intraday).
     """
     daily_returns = results["PnL"].dropna()
     cumulative = results["Capital"].dropna()
 
     sharpe = (
-        daily_returns.mean() / daily_returns.std() * np.sqrt(252)
+        daily_returns.mean() / daily_returns.std() * np.sqrt(periods_per_year)
         if daily_returns.std() > 0 else 0
     )
 
@@ -104,8 +261,8 @@ def compute_metrics(results):
         total_days = (results.index[-1] - results.index[0]).days
         years = total_days / 365.25 if total_days > 0 else 0
     else:
-        # fallback to assuming 252 trading days/year
-        years = len(cumulative) / 252
+        # fallback to assuming periods_per_year bars/year
+        years = len(cumulative) / periods_per_year
 
     total_return = (final_cap / initial_cap - 1) * 100
     cagr = ((final_cap / initial_cap) ** (1 / years) - 1) * 100 if years > 0 else 0
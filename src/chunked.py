@@ -0,0 +1,332 @@
+import os
+import numpy as np
+import pandas as pd
+
+from src.backtest import size_positions, run_ledger
+from src.panel import SharedPricePanel
+from src.strategy import generate_signals
+
+
+def write_price_store(price_df, path):
+    """
+    Save aligned prices as an on-disk store readable by iter_price_chunks.
+
+    Args:
+        price_df (pd.DataFrame): Aligned prices, one column per ticker
+        path (str): '.npy' for a memory-mapped panel, otherwise a CSV
+    """
+    if path.endswith(".npy"):
+        SharedPricePanel.create(price_df, path=path).close()
+    else:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        price_df.to_csv(path)
+    print(f"[Export] Price store saved to {path}")
+
+
+def iter_price_chunks(path, columns, chunk_size=100_000):
+    """
+    Stream time blocks of selected tickers from an on-disk price store.
+
+    Args:
+        path (str): A prices CSV (as saved by download_prices) or a panel .npy
+            written by SharedPricePanel.create(path=...)
+        columns (list): Tickers to read
+        chunk_size (int): Bars per block
+
+    Yields:
+        pd.DataFrame: Consecutive blocks of at most `chunk_size` bars
+    """
+    if path.endswith(".npy"):
+        panel = SharedPricePanel.open(path)
+        try:
+            for start in range(0, len(panel), chunk_size):
+                yield panel.chunk(start, start + chunk_size, columns)
+        finally:
+            panel.close()
+        return
+
+    index_col = pd.read_csv(path, nrows=0).columns[0]
+    reader = pd.read_csv(path, usecols=[index_col, *columns], index_col=0,
+                         parse_dates=True, chunksize=chunk_size)
+    for chunk in reader:
+        yield chunk[columns]
+
+
+def pair_statistics(chunks, A, B):
+    """
+    One streaming pass for the full-sample hedge ratio and spread moments.
+
+    Matches compute_spread's OLS beta (with intercept) and generate_signals'
+    population mean/std, using sums shifted by the first observation for stability.
+
+    Returns:
+        dict: beta, spread_mean, spread_std, n
+    """
+    n = 0
+    pivot = None
+    sx = sy = sxx = syy = sxy = 0.0
+
+    for chunk in chunks:
+        x = chunk[B].to_numpy(dtype=float)
+        y = chunk[A].to_numpy(dtype=float)
+        if pivot is None:
+            pivot = (x[0], y[0])
+        dx = x - pivot[0]
+        dy = y - pivot[1]
+        n += len(x)
+        sx += dx.sum()
+        sy += dy.sum()
+        sxx += dx @ dx
+        syy += dy @ dy
+        sxy += dx @ dy
+
+    if n < 2:
+        raise ValueError("Need at least two bars to estimate pair statistics.")
+
+    var_x = sxx / n - (sx / n) ** 2
+    var_y = syy / n - (sy / n) ** 2
+    cov_xy = sxy / n - (sx / n) * (sy / n)
+    beta = cov_xy / var_x
+
+    spread_mean = (pivot[1] + sy / n) - beta * (pivot[0] + sx / n)
+    spread_var = var_y - 2 * beta * cov_xy + beta ** 2 * var_x
+    return {"beta": beta, "spread_mean": spread_mean, "spread_std": np.sqrt(max(spread_var, 0.0)), "n": n}
+
+
+def _min_rows(chunks, rows):
+    """
+    Merge leading chunks until the first one holds at least `rows` bars.
+    """
+    buffer = []
+    for chunk in chunks:
+        if buffer is None:
+            yield chunk
+            continue
+        buffer.append(chunk)
+        if sum(len(c) for c in buffer) >= rows:
+            yield pd.concat(buffer)
+            buffer = None
+    if buffer:
+        yield pd.concat(buffer)
+
+
+def backtest_pair_chunked(
+    path, A, B,
+    chunk_size=100_000,
+    capital_base=1_000_000,
+    risk_aversion=1.0,
+    slippage_pct=0.0005,
+    transaction_cost_pct=0.001,
+    max_leverage=2.0,
+    stop_loss_pct=None,
+    window=20,
+    entry_z=1.0,
+    exit_z=0.0,
+    hysteresis=False,
+    trailing_stop_pct=None,
+    max_holding_bars=None,
+    cooldown_bars=0,
+    stop_loss_exit=False
+):
+    """
+    Out-of-core equivalent of compute_spread + generate_signals + backtest_pair.
+
+    A first pass streams the store for the hedge ratio and spread moments; a second
+    pass backtests block by block, carrying the rolling-window tail, last exposure and
+    capital across chunk boundaries. Concatenated output matches the in-memory path to
+    floating-point tolerance, with peak memory set by `chunk_size`.
+
+    `stop_loss_pct` tags bars as in backtest_pair; the exit-rule kernel's per-trade
+    state is not carried across chunks, so exiting stops, trailing stops, holding
+    limits and cool-downs raise ValueError.
+
+    Yields:
+        pd.DataFrame: Result rows (same columns as backtest_pair) for each block
+    """
+    if (stop_loss_pct and stop_loss_exit) or trailing_stop_pct or max_holding_bars or cooldown_bars:
+        raise ValueError("Exit rules (stop_loss_exit, trailing_stop, max_holding_bars, cooldown_bars) "
+                         "are not supported by the chunked backtest.")
+
+    stats = pair_statistics(iter_price_chunks(path, [A, B], chunk_size), A, B)
+    beta = stats["beta"]
+
+    tail = None
+    last_exposure = None
+    last_signal = 0
+    capital = capital_base
+
+    for chunk in _min_rows(iter_price_chunks(path, [A, B], chunk_size), window):
+        spread = chunk[A] - beta * chunk[B]
+        signals = generate_signals(spread, entry_z, exit_z,
+                                   mean=stats["spread_mean"], std=stats["spread_std"],
+                                   hysteresis=hysteresis, initial=last_signal)
+
+        extended = spread if tail is None else pd.concat([tail, spread])
+        k = len(extended) - len(spread)
+        spread_mean = extended.rolling(window).mean().iloc[k:]
+        spread_std = extended.rolling(window).std().iloc[k:]
+        # Only the opening window has NaN std to back-fill, as in backtest_pair
+        volatility = spread_std.bfill() if tail is None else spread_std
+
+        zscore, position_size = size_positions(
+            spread, spread_mean, spread_std, volatility, risk_aversion, max_leverage
+        )
+        exposure = position_size * signals
+
+        if tail is None:
+            ledger_spread, ledger_exposure, rows = spread, exposure, slice(1, None)
+        else:
+            ledger_spread = pd.concat([tail.iloc[-1:], spread])
+            ledger_exposure = pd.concat([last_exposure, exposure])
+            rows = slice(0, None)
+
+        pnl, capital_path, events = run_ledger(
+            ledger_spread, ledger_exposure, capital,
+            slippage_pct, transaction_cost_pct, stop_loss_pct
+        )
+
+        results = pd.DataFrame({
+            "Spread": spread.iloc[rows],
+            "ZScore": zscore.iloc[rows],
+            "Signal": signals.iloc[rows],
+            "PositionSize": position_size.iloc[rows],
+            "Exposure": exposure.iloc[rows],
+            "PnL": pnl,
+            "Capital": capital_path,
+            "Event": events
+        })
+
+        if capital_path:
+            capital = capital_path[-1]
+        last_exposure = exposure.iloc[-1:]
+        last_signal = int(signals.iloc[-1])
+        tail = extended.iloc[-(window - 1):] if window > 1 else extended.iloc[-1:]
+
+        yield results
+
+
+class StreamingMetrics:
+    """
+    Accumulates compute_metrics over result chunks without holding the full history.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.pnl_n = 0
+        self.pnl_mean = 0.0
+        self.pnl_m2 = 0.0
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.trade_count = 0
+        self.wins = 0
+        self.signal_changes = 0
+        self.exposed = 0
+        self.last_signal = np.nan
+        self.first_cap = None
+        self.last_cap = None
+        self.first_index = None
+        self.last_index = None
+
+    def update(self, results):
+        if results.empty:
+            return
+
+        pnl = results["PnL"].dropna().to_numpy(dtype=float)
+        if len(pnl):
+            # Chan et al. parallel merge of mean / sum of squared deviations
+            mean = pnl.mean()
+            m2 = ((pnl - mean) ** 2).sum()
+            total = self.pnl_n + len(pnl)
+            delta = mean - self.pnl_mean
+            self.pnl_m2 += m2 + delta ** 2 * self.pnl_n * len(pnl) / total
+            self.pnl_mean += delta * len(pnl) / total
+            self.pnl_n = total
+            self.wins += int((pnl > 0).sum())
+
+        capital = results["Capital"].dropna().to_numpy(dtype=float)
+        if len(capital):
+            running_peak = np.maximum.accumulate(np.maximum(capital, self.peak))
+            self.max_drawdown = max(self.max_drawdown, float((running_peak - capital).max()))
+            self.peak = running_peak[-1]
+            if self.first_cap is None:
+                self.first_cap = capital[0]
+            self.last_cap = capital[-1]
+
+        signal = results["Signal"].to_numpy(dtype=float)
+        previous = np.concatenate([[self.last_signal], signal[:-1]])
+        self.signal_changes += int((previous != 0).sum())
+        self.last_signal = signal[-1]
+
+        self.trade_count += int(results["Event"].isin(["Entry", "Exit"]).sum())
+        self.exposed += int((results["Exposure"].abs() > 0).sum())
+        self.n += len(results)
+
+        if self.first_index is None:
+            self.first_index = results.index[0]
+        self.last_index = results.index[-1]
+
+    def result(self, periods_per_year=252):
+        """
+        Returns:
+            dict: Same keys and rounding as compute_metrics
+        """
+        std = np.sqrt(self.pnl_m2 / (self.pnl_n - 1)) if self.pnl_n > 1 else np.nan
+        sharpe = self.pnl_mean / std * np.sqrt(periods_per_year) if std > 0 else 0
+
+        win_ratio = self.wins / self.signal_changes if self.signal_changes > 0 else 0
+
+        if isinstance(self.first_index, pd.Timestamp):
+            total_days = (self.last_index - self.first_index).days
+            years = total_days / 365.25 if total_days > 0 else 0
+        else:
+            years = self.n / periods_per_year
+
+        total_return = (self.last_cap / self.first_cap - 1) * 100
+        cagr = ((self.last_cap / self.first_cap) ** (1 / years) - 1) * 100 if years > 0 else 0
+
+        return {
+            "Sharpe Ratio": round(sharpe, 4),
+            "Max Drawdown": round(self.max_drawdown, 4),
+            "Win Ratio": round(win_ratio, 4),
+            "Trade Count": int(self.trade_count),
+            "CAGR (%)": round(cagr, 2),
+            "Total Return (%)": round(total_return, 2),
+            "Exposure Time (%)": round(self.exposed / self.n * 100, 2)
+        }
+
+
+def run_chunked_backtest(path, A, B, output_dir="results", log_dir="logs", periods_per_year=252, **kwargs):
+    """
+    Stream a pair backtest to `<output_dir>/<A>_<B>_results.csv` chunk by chunk.
+
+    Trade events are appended to `<log_dir>/<A>_<B>_trades.csv` (as save_trade_log
+    writes them) from the same chunks, so no full-history frame is ever built.
+
+    Args:
+        path (str): On-disk price store (see iter_price_chunks)
+        A, B (str): Tickers
+        output_dir (str): Directory for the incremental results CSV
+        log_dir (str): Directory for the incremental trade log
+        periods_per_year (int): Bars per year for Sharpe annualization
+        **kwargs: Passed to backtest_pair_chunked
+
+    Returns:
+        dict: compute_metrics-equivalent metrics for the full history
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(log_dir, exist_ok=True)
+    out_path = os.path.join(output_dir, f"{A}_{B}_results.csv")
+    log_path = os.path.join(log_dir, f"{A}_{B}_trades.csv")
+    metrics = StreamingMetrics()
+
+    header = True
+    for results in backtest_pair_chunked(path, A, B, **kwargs):
+        mode = "w" if header else "a"
+        results.to_csv(out_path, mode=mode, header=header)
+        results[results["Event"].notna()].to_csv(log_path, mode=mode, header=header)
+        metrics.update(results)
+        header = False
+
+    print(f"[Export] Full results saved to {out_path}")
+    print(f"[Export] Trade log saved to {log_path}")
+    return metrics.result(periods_per_year)
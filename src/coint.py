@@ -1,28 +1,161 @@
+import numpy as np
 import pandas as pd
 import itertools
 from statsmodels.tsa.stattools import coint
+from src.panel import SharedPricePanel, worker_panel
+from src.executors import run_pair_tasks
 
-def find_cointegrated_pairs(price_df, significance=0.2):
+# Fewest bars on either side of the hold-out split for a meaningful Engle-Granger test
+MIN_HOLDOUT_BARS = 20
+
+def adjust_pvalues(pvals, method="bh"):
+    """
+    Correct p-values for multiple comparisons.
+
+    Args:
+        pvals (array-like): Raw p-values, one per tested pair
+        method (str): 'bh' (Benjamini-Hochberg FDR) or 'holm' (Holm-Bonferroni FWER)
+
+    Returns:
+        np.ndarray: Adjusted p-values in the original order
+    """
+    pvals = np.asarray(pvals, dtype=float)
+    m = len(pvals)
+    if m == 0:
+        return pvals
+
+    order = np.argsort(pvals)
+    ranked = pvals[order]
+    ranks = np.arange(1, m + 1)
+
+    if method == "bh":
+        # Step-up: running minimum from the largest p-value down
+        adjusted = np.minimum.accumulate((ranked * m / ranks)[::-1])[::-1]
+    elif method == "holm":
+        # Step-down: running maximum from the smallest p-value up
+        adjusted = np.maximum.accumulate(ranked * (m - ranks + 1))
+    else:
+        raise ValueError("Invalid correction. Choose from 'bh' or 'holm'.")
+
+    out = np.empty(m)
+    out[order] = np.clip(adjusted, 0, 1)
+    return out
+
+
+def _coint_task(i, j, start, stop):
+    panel = worker_panel()
+    stat, pval, _ = coint(panel.values[i, start:stop], panel.values[j, start:stop])
+    return stat, pval
+
+
+def coint_stats(price_df, index_pairs, start=0, stop=None, n_jobs=1, executor=None):
+    """
+    Engle-Granger statistics for column-index pairs over bars [start, stop).
+
+    Runs in-process for n_jobs=1, else on `executor` (or a local process pool).
+
+    Returns:
+        np.ndarray: (pairs x 2) array of (t-statistic, p-value)
+    """
+    stop = len(price_df) if stop is None else stop
+    if not index_pairs:
+        return np.empty((0, 2))
+
+    if n_jobs <= 1 and executor is None:
+        values = price_df.to_numpy(dtype=float).T
+        return np.array([coint(values[i, start:stop], values[j, start:stop])[:2] for i, j in index_pairs])
+
+    tasks = [(i, j, start, stop) for i, j in index_pairs]
+    with SharedPricePanel.create(price_df) as panel:
+        return np.array(run_pair_tasks({"close": panel}, _coint_task, tasks, n_jobs, executor=executor))
+
+
+def _coint_pvalues(price_df, index_pairs, start, stop, n_jobs=1, executor=None):
+    return coint_stats(price_df, index_pairs, start, stop, n_jobs, executor)[:, 1]
+
+
+def find_cointegrated_pairs(
+    price_df,
+    significance=0.2,
+    correction=None,
+    holdout=0.0,
+    holdout_significance=None,
+    top_k=None,
+    n_jobs=1,
+    pair_index=None,
+    executor=None
+):
     """
     Test all pairs for cointegration and return those below the significance threshold.
 
     Args:
         price_df (pd.DataFrame): DataFrame of price series (one column per ticker)
         significance (float): p-value threshold for cointegration
+        correction (str): None, 'bh' or 'holm'; threshold is applied to adjusted p-values
+        holdout (float): Fraction of trailing bars held out; pairs are tested on the
+            leading bars and survivors must also cointegrate on the hold-out block.
+            Both blocks need at least MIN_HOLDOUT_BARS bars
+        holdout_significance (float): Hold-out threshold (defaults to `significance`)
+        top_k (int): Keep only the K best pairs by (adjusted) p-value
+        n_jobs (int): Worker processes sharing one price panel (1 = in-process)
+        pair_index (PairStatsIndex): Read p-values from the index instead of
+            re-testing. These are Engle-Granger fits on the index's price window (the
+            last window passed to PairStatsIndex.update, refit every `refit_every`
+            bars), i.e. this run's `price_df`. Pairs missing from the index are tested
+            as usual. Ignored when `holdout` > 0, since those fits include the hold-out block
+        executor (Executor): Backend for the pair tests (see src.executors); overrides n_jobs
 
     Returns:
-        list of tuples: (ticker1, ticker2, p-value)
+        list of tuples: (ticker1, ticker2, p-value, adjusted p-value); the adjusted
+        p-value equals the raw one when no correction is applied
+
+    Raises:
+        ValueError: `holdout` outside [0, 1), or leaving fewer than MIN_HOLDOUT_BARS
+            bars in the hold-out or estimation block
     """
-    tickers = price_df.columns
-    coint_pairs = []
+    if not 0 <= holdout < 1:
+        raise ValueError("holdout must be in [0, 1).")
 
-    for pair in itertools.combinations(tickers, 2):
-        series1 = price_df[pair[0]]
-        series2 = price_df[pair[1]]
-        _, pval, _ = coint(series1, series2)
+    split = len(price_df) - int(len(price_df) * holdout)
+    if holdout > 0 and min(split, len(price_df) - split) < MIN_HOLDOUT_BARS:
+        raise ValueError(
+            f"holdout={holdout} splits {len(price_df)} bars into {split} estimation and "
+            f"{len(price_df) - split} hold-out bars; each block needs at least {MIN_HOLDOUT_BARS}. "
+            f"Load more history or change holdout_fraction."
+        )
+    pairs = list(itertools.combinations(range(price_df.shape[1]), 2))
+    if pair_index is not None and holdout > 0:
+        print("[Coint] Hold-out enabled: testing the leading bars instead of reading "
+              "whole-window p-values from the pair index.")
+        pair_index = None
+    if pair_index is None:
+        pvals = _coint_pvalues(price_df, pairs, 0, split, n_jobs, executor)
+    else:
+        tickers = price_df.columns
+        names = [f"{tickers[i]}/{tickers[j]}" for i, j in pairs]
+        indexed = pair_index.table.set_index("Pair")["P-Value"]
+        # Pairs skipped by the index's correlation prefilter have no p-value and are excluded
+        pvals = indexed.reindex(names).fillna(1.0).to_numpy(dtype=float)
+        missing = np.flatnonzero(~np.isin(names, indexed.index))
+        if len(missing):
+            pvals[missing] = _coint_pvalues(price_df, [pairs[k] for k in missing], 0, split, n_jobs, executor)
 
-        if pval < significance:
-            coint_pairs.append((pair[0], pair[1], round(pval, 4)))
+    scores = adjust_pvalues(pvals, correction) if correction else pvals
+    keep = np.flatnonzero(scores < significance)
+    keep = keep[np.argsort(scores[keep], kind="stable")]
 
-    coint_pairs.sort(key=lambda x: x[2])  # Sort by p-value ascending
-    return coint_pairs
+    if holdout > 0 and len(keep):
+        threshold = significance if holdout_significance is None else holdout_significance
+        retest = _coint_pvalues(price_df, [pairs[i] for i in keep], split, len(price_df), n_jobs, executor)
+        stable = keep[retest < threshold]
+        print(f"[Coint] {len(stable)}/{len(keep)} pairs passed the hold-out re-test.")
+        keep = stable
+
+    if top_k is not None:
+        keep = keep[:top_k]
+
+    tickers = price_df.columns
+    return [
+        (tickers[pairs[i][0]], tickers[pairs[i][1]], round(float(pvals[i]), 4), round(float(scores[i]), 4))
+        for i in keep
+    ]
@@ -0,0 +1,209 @@
+import heapq
+import numpy as np
+import pandas as pd
+
+
+class ExecutionSimulator:
+    """
+    Event-driven fill model for spread exposure changes.
+
+    Orders are generated on each bar's close as the difference between target and
+    working exposure, released after `latency_bars`, and filled at the arrival bar's
+    open (or close). Fills are capped at `participation` of the bar's tradable
+    capacity; any unfilled remainder stays queued and completes on later bars.
+
+    When the target moves against working orders, their unfilled quantity is
+    cancelled (newest first) before any new order is queued, so obsolete orders
+    neither fill nor pay costs.
+    """
+
+    def __init__(
+        self,
+        latency_bars=1,
+        participation=0.1,
+        fill_at="open",
+        slippage_pct=0.0005,
+        transaction_cost_pct=0.001
+    ):
+        if fill_at not in ("open", "close"):
+            raise ValueError("Invalid fill_at. Choose from 'open' or 'close'.")
+        if fill_at == "open" and latency_bars < 1:
+            raise ValueError("Open fills require latency_bars >= 1 to avoid look-ahead.")
+        if participation <= 0:
+            raise ValueError("participation must be positive.")
+
+        self.latency_bars = int(latency_bars)
+        self.participation = participation
+        self.fill_at = fill_at
+        self.slippage_pct = slippage_pct
+        self.transaction_cost_pct = transaction_cost_pct
+
+    @classmethod
+    def from_config(cls, config, slippage_pct=0.0005, transaction_cost_pct=0.001):
+        """
+        Build a simulator from the `execution` block of an experiment config.
+
+        Returns:
+            ExecutionSimulator or None: None when the block is missing or disabled
+        """
+        if not config or not config.get("enabled", False):
+            return None
+
+        return cls(
+            latency_bars=config.get("latency_bars", 1),
+            participation=config.get("participation", 0.1),
+            fill_at=config.get("fill_at", "open"),
+            slippage_pct=slippage_pct,
+            transaction_cost_pct=transaction_cost_pct
+        )
+
+    def capacity(self, volume1, volume2, beta):
+        """
+        Convert leg volumes into a per-bar fill cap in spread units.
+
+        One unit of spread exposure trades one share of leg 1 and |beta| shares of
+        leg 2, so the binding leg sets the cap.
+
+        Returns:
+            np.ndarray or None: Max absolute exposure fillable per bar
+        """
+        if volume1 is None or volume2 is None:
+            return None
+
+        v1 = np.asarray(volume1, dtype=float)
+        v2 = np.asarray(volume2, dtype=float)
+        legs = np.minimum(v1, v2 / abs(beta)) if beta != 0 else v1
+        return np.nan_to_num(legs, nan=0.0) * self.participation
+
+    def simulate(self, target, close, open_=None, capacity=None):
+        """
+        Run the order queue against a bar series.
+
+        Args:
+            target (array-like): Desired exposure decided on each bar's close
+            close (array-like): Spread close per bar
+            open_ (array-like): Spread open per bar; required when fill_at='open'
+            capacity (array-like): Max absolute exposure fillable per bar (None = unlimited)
+
+        Returns:
+            pd.DataFrame: Held, Filled, FillPrice, Cost, Pending and FillLag per bar
+        """
+        index = target.index if isinstance(target, pd.Series) else None
+        target = np.nan_to_num(np.asarray(target, dtype=float))
+        close = np.asarray(close, dtype=float)
+        n = len(target)
+
+        if self.fill_at == "open":
+            if open_ is None:
+                raise ValueError("fill_at='open' requires open prices.")
+            price = np.asarray(open_, dtype=float)
+        else:
+            price = close
+
+        cap = np.full(n, np.inf) if capacity is None else np.asarray(capacity, dtype=float)
+        unit_cost = self.slippage_pct + self.transaction_cost_pct
+
+        held = np.zeros(n)
+        filled = np.zeros(n)
+        fill_price = np.full(n, np.nan)
+        cost = np.zeros(n)
+        pending = np.zeros(n)
+        fill_lag = np.full(n, np.nan)
+
+        # Heap entries: (release_bar, seq, order_bar, qty). seq keeps FIFO order per bar.
+        queue = []
+        seq = 0
+        position = 0.0
+        working = 0.0
+
+        for t in range(n):
+            if self.fill_at == "open":
+                position = self._drain(queue, t, price[t], cap[t], position,
+                                       filled, fill_price, cost, fill_lag, unit_cost)
+
+            delta = target[t] - working
+            if delta != 0:
+                working = target[t]
+                delta = self._net(queue, delta)
+            if delta != 0:
+                heapq.heappush(queue, (t + self.latency_bars, seq, t, delta))
+                seq += 1
+
+            if self.fill_at == "close":
+                position = self._drain(queue, t, price[t], cap[t], position,
+                                       filled, fill_price, cost, fill_lag, unit_cost)
+
+            held[t] = position
+            pending[t] = working - position
+
+        return pd.DataFrame({
+            "Held": held,
+            "Filled": filled,
+            "FillPrice": fill_price,
+            "Cost": cost,
+            "Pending": pending,
+            "FillLag": fill_lag
+        }, index=index)
+
+    @staticmethod
+    def _net(queue, delta):
+        """
+        Cancel unfilled orders opposing `delta`, newest first.
+
+        Returns:
+            float: The part of `delta` left to queue as a new order
+        """
+        kept = []
+        for release, seq, order_bar, qty in sorted(queue, key=lambda entry: -entry[1]):
+            if delta != 0 and qty * delta < 0:
+                take = min(abs(qty), abs(delta))
+                qty -= np.sign(qty) * take
+                delta -= np.sign(delta) * take
+            if qty != 0:
+                kept.append((release, seq, order_bar, qty))
+        queue[:] = kept
+        heapq.heapify(queue)
+        return delta
+
+    @staticmethod
+    def _drain(queue, t, px, budget, position, filled, fill_price, cost, fill_lag, unit_cost):
+        """
+        Fill released orders at bar t until the capacity budget is spent.
+        """
+        carry = []
+        notional = 0.0
+        lag_weight = 0.0
+        traded = 0.0
+
+        while queue and queue[0][0] <= t:
+            release, seq, order_bar, qty = heapq.heappop(queue)
+            if budget <= 0 or np.isnan(px):
+                carry.append((release, seq, order_bar, qty))
+                continue
+
+            size = min(abs(qty), budget)
+            fill = np.sign(qty) * size
+            budget -= size
+
+            position += fill
+            filled[t] += fill
+            notional += fill * px
+            traded += size
+            lag_weight += size * (t - order_bar)
+
+            remainder = qty - fill
+            if remainder != 0:
+                carry.append((release, seq, order_bar, remainder))
+
+        for entry in carry:
+            heapq.heappush(queue, entry)
+
+        if traded > 0:
+            cost[t] = traded * unit_cost
+            fill_lag[t] = lag_weight / traded
+            if filled[t] != 0:
+                fill_price[t] = notional / filled[t]
+            else:
+                fill_price[t] = px
+
+        return position
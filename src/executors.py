@@ -0,0 +1,416 @@
+import os
+import abc
+import time
+import uuid
+import queue
+import argparse
+import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+
+from src.panel import SharedPricePanel, _WORKER_PANELS, _attach_worker
+
+
+class Executor(abc.ABC):
+    """
+    Backend that runs per-pair tasks against shared price panels.
+
+    Subclasses implement map(); tasks carry column indices and read prices through
+    src.panel.worker_panel(), so the same task function runs on every backend.
+    """
+
+    @abc.abstractmethod
+    def map(self, func, tasks, panels=None, chunksize=64):
+        """
+        Run `func(*task)` for every task.
+
+        Args:
+            func (callable): Top-level (importable) function
+            tasks (list of tuples): Arguments per task
+            panels (dict): Field name -> SharedPricePanel made available to func
+            chunksize (int): Tasks shipped to a worker per round-trip
+
+        Returns:
+            list: func results in task order
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _run_local(func, tasks, panels):
+    previous = dict(_WORKER_PANELS)
+    _WORKER_PANELS.update(panels or {})
+    try:
+        return [func(*task) for task in tasks]
+    finally:
+        _WORKER_PANELS.clear()
+        _WORKER_PANELS.update(previous)
+
+
+class SerialExecutor(Executor):
+    """
+    In-process, one task at a time.
+    """
+
+    def map(self, func, tasks, panels=None, chunksize=64):
+        return _run_local(func, tasks, panels)
+
+
+class ThreadExecutor(Executor):
+    """
+    Thread pool in this process; panels are shared directly with no attach step.
+
+    Useful when the task spends most of its time in NumPy/LAPACK code that
+    releases the GIL.
+    """
+
+    def __init__(self, n_workers=4):
+        self.n_workers = n_workers
+
+    def map(self, func, tasks, panels=None, chunksize=64):
+        if not tasks:
+            return []
+        chunks = [tasks[k:k + chunksize] for k in range(0, len(tasks), chunksize)]
+        previous = dict(_WORKER_PANELS)
+        _WORKER_PANELS.update(panels or {})
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_workers) as pool:
+                results = pool.map(lambda chunk: [func(*task) for task in chunk], chunks)
+                return [out for chunk in results for out in chunk]
+        finally:
+            _WORKER_PANELS.clear()
+            _WORKER_PANELS.update(previous)
+
+
+class ProcessExecutor(Executor):
+    """
+    Local worker processes attached once to the shared-memory panels.
+    """
+
+    def __init__(self, n_workers=None):
+        self.n_workers = n_workers or os.cpu_count()
+
+    def map(self, func, tasks, panels=None, chunksize=64):
+        if not tasks:
+            return []
+        specs = {field: panel.spec for field, panel in (panels or {}).items()}
+        with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_attach_worker,
+                                 initargs=(specs,)) as pool:
+            return list(pool.map(func, *zip(*tasks), chunksize=chunksize))
+
+
+# Work-queue protocol
+#
+# The broker holds two queues. The driver puts one message per task chunk on
+# `tasks`:  (job_id, chunk_id, func, panel_specs, [task args, ...])
+# and workers put one message per chunk on `results`:
+#           (job_id, chunk_id, ok, [func results] or traceback text).
+# A None message on `tasks` stops the worker that receives it. Panels travel as
+# memmap specs, so workers on other machines need the panel directory on a
+# shared filesystem (and the same code checkout).
+
+_TASKS = queue.Queue()
+_RESULTS = queue.Queue()
+
+
+def _task_queue():
+    return _TASKS
+
+
+def _result_queue():
+    return _RESULTS
+
+
+class _BrokerServer(BaseManager):
+    pass
+
+
+_BrokerServer.register("tasks", callable=_task_queue)
+_BrokerServer.register("results", callable=_result_queue)
+
+
+class _BrokerClient(BaseManager):
+    pass
+
+
+_BrokerClient.register("tasks")
+_BrokerClient.register("results")
+
+
+def _parse_address(address):
+    if isinstance(address, str):
+        host, port = address.rsplit(":", 1)
+        return host, int(port)
+    return tuple(address)
+
+
+def _authkey(authkey):
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def serve_broker(address, authkey):
+    """
+    Run a work-queue broker in the foreground (blocks until killed).
+    """
+    server = _BrokerServer(address=_parse_address(address), authkey=_authkey(authkey))
+    print(f"[Broker] Listening on {address}")
+    server.get_server().serve_forever()
+
+
+def connect_broker(address, authkey, retries=10, delay=1.0):
+    client = _BrokerClient(address=_parse_address(address), authkey=_authkey(authkey))
+    for attempt in range(retries):
+        try:
+            client.connect()
+            return client
+        except ConnectionRefusedError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(delay)
+
+
+def run_worker(address, authkey):
+    """
+    Worker loop: pull task chunks from the broker until a stop message arrives.
+
+    Panels are attached once per job and kept for that job's later chunks.
+    """
+    client = connect_broker(address, authkey)
+    tasks, results = client.tasks(), client.results()
+    attached = {}
+    current_job = None
+
+    while True:
+        message = tasks.get()
+        if message is None:
+            break
+        job_id, chunk_id, func, specs, chunk = message
+        if job_id != current_job:
+            for panel in attached.values():
+                panel.close()
+            attached = {}
+            current_job = job_id
+        try:
+            for field, spec in specs.items():
+                key = spec.get("path") or spec.get("name")
+                if key not in attached:
+                    attached[key] = SharedPricePanel.attach(spec)
+                _WORKER_PANELS[field] = attached[key]
+            results.put((job_id, chunk_id, True, [func(*task) for task in chunk]))
+        except Exception:
+            results.put((job_id, chunk_id, False, traceback.format_exc()))
+
+    for panel in attached.values():
+        panel.close()
+
+
+class QueueExecutor(Executor):
+    """
+    Multi-node backend: shards tasks into chunks on a work-queue broker.
+
+    Workers started with `python -m src.executors worker --address HOST:PORT
+    --authkey KEY` on any machine pull chunks, run them and push results back;
+    this driver gathers them in task order. Shared-memory panels are copied to
+    memory-mapped files under `panel_dir`, which remote workers must be able to
+    read at the same path.
+
+    If no result arrives for `timeout` seconds (e.g. a worker died mid-chunk), the
+    chunks still missing are put back on the queue, up to `retries` times, before
+    map() raises TimeoutError. `timeout=None` waits forever.
+    """
+
+    def __init__(self, address, authkey, panel_dir="data/panels", timeout=600.0, retries=2, broker=None):
+        self.address = address
+        self.authkey = authkey
+        self.panel_dir = panel_dir
+        self.timeout = timeout
+        self.retries = retries
+        # LocalBroker owned by this executor, shut down on close()
+        self._broker = broker
+        self._client = connect_broker(address, authkey)
+
+    def close(self):
+        if self._broker is not None:
+            self._broker.shutdown()
+            self._broker = None
+
+    def map(self, func, tasks, panels=None, chunksize=64):
+        if not tasks:
+            return []
+
+        job_id = uuid.uuid4().hex[:12]
+        exported = []
+        try:
+            specs = {}
+            for field, panel in (panels or {}).items():
+                if panel.spec["kind"] != "memmap":
+                    panel = SharedPricePanel.create(
+                        panel.frame(), path=os.path.join(self.panel_dir, f"{job_id}_{field}.npy")
+                    )
+                    exported.append(panel)
+                specs[field] = panel.spec
+
+            task_queue, result_queue = self._client.tasks(), self._client.results()
+            chunks = [tasks[k:k + chunksize] for k in range(0, len(tasks), chunksize)]
+            for chunk_id, chunk in enumerate(chunks):
+                task_queue.put((job_id, chunk_id, func, specs, chunk))
+
+            gathered = {}
+            attempts = 0
+            while len(gathered) < len(chunks):
+                try:
+                    got_job, chunk_id, ok, payload = result_queue.get(timeout=self.timeout)
+                except queue.Empty:
+                    missing = [k for k in range(len(chunks)) if k not in gathered]
+                    if attempts >= self.retries:
+                        raise TimeoutError(
+                            f"{len(missing)}/{len(chunks)} chunks of job {job_id} not returned "
+                            f"after {attempts + 1} attempts of {self.timeout}s."
+                        )
+                    attempts += 1
+                    print(f"[Executor] No result for {self.timeout}s; requeueing {len(missing)} chunks "
+                          f"of job {job_id} (retry {attempts}/{self.retries}).")
+                    for k in missing:
+                        task_queue.put((job_id, k, func, specs, chunks[k]))
+                    continue
+                if got_job != job_id or chunk_id in gathered:
+                    # Stale result from an abandoned job, or a duplicate of a requeued chunk
+                    continue
+                if not ok:
+                    raise RuntimeError(f"Worker failed on chunk {chunk_id} of job {job_id}:\n{payload}")
+                gathered[chunk_id] = payload
+        finally:
+            for panel in exported:
+                panel.unlink()
+
+        return [out for chunk_id in range(len(chunks)) for out in gathered[chunk_id]]
+
+
+class LocalBroker:
+    """
+    Stand-in for a multi-node deployment: a broker plus `n_workers` worker
+    processes on this machine, speaking the same protocol as remote workers.
+
+    Example:
+        with LocalBroker(n_workers=4) as broker:
+            executor = broker.executor()
+    """
+
+    def __init__(self, n_workers=2, authkey=None):
+        self.authkey = authkey or uuid.uuid4().hex
+        self._server = _BrokerServer(address=("127.0.0.1", 0), authkey=_authkey(self.authkey))
+        self._server.start()
+        host, port = self._server.address
+        self.address = f"{host}:{port}"
+        self._workers = []
+        for _ in range(n_workers):
+            worker = multiprocessing.Process(target=run_worker, args=(self.address, self.authkey), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def executor(self, panel_dir="data/panels", timeout=600.0, retries=2):
+        return QueueExecutor(self.address, self.authkey, panel_dir=panel_dir, timeout=timeout, retries=retries)
+
+    def shutdown(self):
+        if not self._workers:
+            return
+        tasks = connect_broker(self.address, self.authkey).tasks()
+        for _ in self._workers:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        self._server.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def default_executor(n_jobs=1):
+    """
+    Executor matching the historical `n_jobs` behaviour (1 = in-process).
+    """
+    return SerialExecutor() if n_jobs <= 1 else ProcessExecutor(n_jobs)
+
+
+def make_executor(config):
+    """
+    Build the executor described by the config's "executor" block.
+
+    Backends: 'serial', 'thread', 'process', or 'queue'. A 'queue' backend with an
+    `address` connects to a running broker; without one it starts a LocalBroker
+    with `local_workers` processes.
+
+    Returns:
+        Executor or None: None when no "executor" block is configured (use n_jobs)
+    """
+    cfg = config.get("executor")
+    if not cfg:
+        return None
+
+    backend = cfg.get("backend", "process")
+    n_workers = cfg.get("n_workers", config.get("n_jobs", 1))
+    if backend == "serial":
+        return SerialExecutor()
+    if backend == "thread":
+        return ThreadExecutor(n_workers)
+    if backend == "process":
+        return ProcessExecutor(n_workers)
+    if backend == "queue":
+        if cfg.get("address"):
+            return QueueExecutor(cfg["address"], cfg.get("authkey", ""), panel_dir=cfg.get("panel_dir", "data/panels"),
+                                 timeout=cfg.get("timeout", 600.0), retries=cfg.get("retries", 2))
+        broker = LocalBroker(n_workers=cfg.get("local_workers", n_workers))
+        return QueueExecutor(broker.address, broker.authkey, panel_dir=cfg.get("panel_dir", "data/panels"),
+                             timeout=cfg.get("timeout", 600.0), retries=cfg.get("retries", 2), broker=broker)
+    raise ValueError("Invalid executor backend. Choose from 'serial', 'thread', 'process' or 'queue'.")
+
+
+def run_pair_tasks(panels, func, tasks, n_jobs=1, chunksize=64, executor=None):
+    """
+    Run `func(*task)` for every task with the panels available via worker_panel().
+
+    Tasks should carry column indices rather than price data; each worker attaches
+    to the shared panels once, so memory stays flat as `n_jobs` grows.
+
+    Args:
+        panels (dict): Field name -> SharedPricePanel (must include 'close')
+        func (callable): Top-level function taking the task arguments
+        tasks (list of tuples): Arguments per task, e.g. (i, j, pval)
+        n_jobs (int): Worker processes when no executor is given (1 = in-process)
+        chunksize (int): Tasks sent to a worker per round-trip
+        executor (Executor): Backend to run on (overrides n_jobs)
+
+    Returns:
+        list: func results in task order
+    """
+    if not tasks:
+        return []
+    executor = executor or default_executor(n_jobs)
+    return executor.map(func, tasks, panels, chunksize)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pair-task work-queue broker and worker")
+    parser.add_argument("role", choices=["broker", "worker"])
+    parser.add_argument("--address", required=True, help="host:port of the broker")
+    parser.add_argument("--authkey", required=True, help="Shared secret for broker connections")
+    args = parser.parse_args()
+
+    if args.role == "broker":
+        serve_broker(args.address, args.authkey)
+    else:
+        run_worker(args.address, args.authkey)
@@ -1,18 +1,20 @@
 import numpy as np
 import pandas as pd
 
-def extract_features(series1, series2, spread, zscore, beta, pval, regime=None):
+def extract_features(series1, series2, spread, zscore, beta, pval, regime=None, window=20, half_life=None):
     """
     Generate ML-ready features from spread and series pair.
-    Optionally tag with regime if provided.
+    Optionally tag with regime if provided. `window` is the volatility lookback in bars;
+    `half_life` may be supplied (e.g. from the pair statistics index) to skip re-estimation.
     """
-    volatility = spread.rolling(20).std().iloc[-1]
+    volatility = spread.rolling(window).std().iloc[-1]
     mean_zscore = zscore.mean()
     std_zscore = zscore.std()
     max_zscore = zscore.max()
     min_zscore = zscore.min()
     z_crosses = ((zscore.shift(1) * zscore) < 0).sum()  # sign flips = mean crossings
-    half_life = estimate_half_life(spread)
+    if half_life is None:
+        half_life = estimate_half_life(spread)
 
     features = {
         "Volatility": round(volatility, 4),
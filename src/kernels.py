@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None  # Numba support optional
+    prange = range
+
+EVENT_NAMES = {1: "Entry", 2: "Exit", 3: "StopLoss", 4: "TrailingStop", 5: "MaxHold"}
+
+
+def _jit(parallel=False):
+    """
+    Compile with Numba when available, otherwise run the same code as plain Python.
+    """
+    def wrap(func):
+        if njit is None:
+            return func
+        return njit(cache=True, parallel=parallel)(func)
+    return wrap
+
+
+@_jit()
+def _exit_rules_kernel(
+    target, spread_returns, capital_base, cost_rate,
+    stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars,
+    held, pnl, capital, events
+):
+    """
+    Sequential pass applying stop-loss, trailing-stop, max-holding and cool-down rules.
+
+    Disabled rules are passed as 0. Writes held exposure, PnL, capital and event codes
+    for bars 1..n-1 in place (bar 0 is the starting state).
+    """
+    n = target.shape[0]
+    held[0] = target[0]
+    capital[0] = capital_base
+
+    trade_pnl = 0.0
+    peak_pnl = 0.0
+    bars_held = 0
+    entry_capital = capital_base
+    cooldown = 0
+    blocked_side = 0.0
+
+    for i in range(1, n):
+        prev = held[i - 1]
+        ret = spread_returns[i]
+        if ret != ret:
+            ret = 0.0
+        gross = prev * ret
+
+        forced = 0
+        if prev != 0:
+            trade_pnl += gross
+            if trade_pnl > peak_pnl:
+                peak_pnl = trade_pnl
+            bars_held += 1
+
+            if stop_loss_pct > 0 and gross < -stop_loss_pct * capital[i - 1]:
+                forced = 3
+            elif trailing_stop_pct > 0 and trade_pnl < peak_pnl - trailing_stop_pct * entry_capital:
+                forced = 4
+            elif max_holding_bars > 0 and bars_held >= max_holding_bars:
+                forced = 5
+
+        desired = target[i]
+        if desired != desired:
+            desired = 0.0
+        side = 0.0
+        if desired > 0:
+            side = 1.0
+        elif desired < 0:
+            side = -1.0
+
+        if forced != 0:
+            curr = 0.0
+            cooldown = cooldown_bars
+            blocked_side = 1.0 if prev > 0 else -1.0
+        elif cooldown > 0:
+            curr = 0.0
+            cooldown -= 1
+        elif blocked_side != 0 and side == blocked_side:
+            # Stay out until the signal re-arms (goes flat or flips)
+            curr = 0.0
+        else:
+            curr = desired
+            blocked_side = 0.0
+
+        cost = abs(curr - prev) * cost_rate
+        pnl[i] = gross - cost
+        capital[i] = capital[i - 1] + pnl[i]
+        held[i] = curr
+
+        if forced != 0:
+            events[i] = forced
+        elif prev == 0 and curr != 0:
+            events[i] = 1
+        elif prev != 0 and curr == 0:
+            events[i] = 2
+        else:
+            events[i] = 0
+
+        # New trade (entry or direct flip) resets per-trade state
+        if curr != 0 and (prev == 0 or curr * prev < 0):
+            trade_pnl = 0.0
+            peak_pnl = 0.0
+            bars_held = 0
+            entry_capital = capital[i]
+
+
+@_jit(parallel=True)
+def _exit_rules_batch(
+    targets, spread_returns, capital_base, cost_rate,
+    stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars,
+    held, pnl, capital, events
+):
+    for p in prange(targets.shape[0]):
+        _exit_rules_kernel(
+            targets[p], spread_returns[p], capital_base, cost_rate,
+            stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars,
+            held[p], pnl[p], capital[p], events[p]
+        )
+
+
+def _rule_args(stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars):
+    return (
+        float(stop_loss_pct or 0.0),
+        float(trailing_stop_pct or 0.0),
+        int(max_holding_bars or 0),
+        int(cooldown_bars or 0),
+    )
+
+
+def apply_exit_rules(
+    target, spread_returns,
+    capital_base=1_000_000,
+    cost_rate=0.0015,
+    stop_loss_pct=None,
+    trailing_stop_pct=None,
+    max_holding_bars=None,
+    cooldown_bars=0
+):
+    """
+    Apply path-dependent exit rules to a target exposure series.
+
+    Unlike the tag-only StopLoss in run_ledger, a triggered stop-loss, trailing stop
+    (`trailing_stop_pct` of capital at entry given back from the trade's best PnL) or
+    holding limit flattens the position. Re-entry waits `cooldown_bars` and until the
+    signal goes flat or flips.
+
+    Args:
+        target (pd.Series): Desired exposure per bar
+        spread_returns (pd.Series): Spread change per bar
+        cost_rate (float): slippage_pct + transaction_cost_pct
+
+    Returns:
+        pd.DataFrame: Exposure, PnL, Capital and Event per bar (bar 0 is the start state)
+    """
+    n = len(target)
+    held = np.zeros(n)
+    pnl = np.zeros(n)
+    capital = np.zeros(n)
+    events = np.zeros(n, dtype=np.int8)
+
+    _exit_rules_kernel(
+        np.asarray(target, dtype=np.float64), np.asarray(spread_returns, dtype=np.float64),
+        float(capital_base), float(cost_rate),
+        *_rule_args(stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars),
+        held, pnl, capital, events
+    )
+
+    return pd.DataFrame({
+        "Exposure": held,
+        "PnL": pnl,
+        "Capital": capital,
+        "Event": [EVENT_NAMES.get(code) for code in events]
+    }, index=getattr(target, "index", None))
+
+
+def apply_exit_rules_batch(
+    targets, spread_returns,
+    capital_base=1_000_000,
+    cost_rate=0.0015,
+    stop_loss_pct=None,
+    trailing_stop_pct=None,
+    max_holding_bars=None,
+    cooldown_bars=0
+):
+    """
+    Run apply_exit_rules for many aligned pairs at once, in parallel under Numba.
+
+    Args:
+        targets (np.ndarray): (pairs x bars) target exposures
+        spread_returns (np.ndarray): (pairs x bars) spread changes
+
+    Returns:
+        dict: 'Exposure', 'PnL', 'Capital' float arrays and 'Event' int8 codes
+        (see EVENT_NAMES), each (pairs x bars)
+    """
+    targets = np.ascontiguousarray(targets, dtype=np.float64)
+    spread_returns = np.ascontiguousarray(spread_returns, dtype=np.float64)
+    held = np.zeros_like(targets)
+    pnl = np.zeros_like(targets)
+    capital = np.zeros_like(targets)
+    events = np.zeros(targets.shape, dtype=np.int8)
+
+    _exit_rules_batch(
+        targets, spread_returns, float(capital_base), float(cost_rate),
+        *_rule_args(stop_loss_pct, trailing_stop_pct, max_holding_bars, cooldown_bars),
+        held, pnl, capital, events
+    )
+    return {"Exposure": held, "PnL": pnl, "Capital": capital, "Event": events}
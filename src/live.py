@@ -0,0 +1,302 @@
+import numpy as np
+
+from src.strategy import compute_spread, hysteresis_signal_grid
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of rows (e.g. one price per ticker per tick).
+
+    Storage and per-slot row views are allocated once; push() copies into the
+    next slot in place.
+    """
+
+    __slots__ = ("data", "capacity", "pos", "count", "_rows")
+
+    def __init__(self, capacity, width):
+        self.data = np.zeros((capacity, width))
+        self.capacity = capacity
+        self.pos = 0
+        self.count = 0
+        self._rows = [self.data[k] for k in range(capacity)]
+
+    def slot(self):
+        """
+        View of the slot the next push() overwrites (the oldest row once full).
+        """
+        return self._rows[self.pos]
+
+    def push(self, row):
+        self._rows[self.pos][:] = row
+        self.pos = (self.pos + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest(self):
+        return self._rows[(self.pos - 1) % self.capacity]
+
+    def ordered(self):
+        """
+        Copy of the stored rows, oldest first (allocates; not for the tick path).
+        """
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.pos, axis=0)
+
+
+class PairState:
+    """
+    Read-only handle on one pair's slot in a LiveSignalEngine.
+    """
+
+    __slots__ = ("name", "ticker_a", "ticker_b", "beta", "row", "_engine")
+
+    def __init__(self, engine, row, ticker_a, ticker_b, beta):
+        self._engine = engine
+        self.row = row
+        self.ticker_a = ticker_a
+        self.ticker_b = ticker_b
+        self.beta = beta
+        self.name = f"{ticker_a}/{ticker_b}"
+
+    @property
+    def spread(self):
+        return self._engine.spread[self.row]
+
+    @property
+    def zscore(self):
+        return self._engine.zscore[self.row]
+
+    @property
+    def signal(self):
+        return self._engine.signal[self.row]
+
+    @property
+    def exposure(self):
+        return self._engine.exposure[self.row]
+
+    def __repr__(self):
+        return f"PairState({self.name}, signal={self.signal:+.0f}, exposure={self.exposure:.4f})"
+
+
+class LiveSignalEngine:
+    """
+    Per-tick spread, z-score, signal and target exposure for many pairs.
+
+    Mirrors generate_signals (z-score against each pair's reference mean/std) and
+    size_positions (rolling-window z-score and volatility) on the latest bar. All
+    buffers, including the outputs, are allocated at construction; update()
+    works in place with `out=` arguments, so steady-state ticks allocate no arrays.
+    Rolling sums are kept incrementally and re-summed from the ring every
+    `resync_every` ticks to bound floating-point drift.
+
+    Outputs (`spread`, `zscore`, `signal`, `position_size`, `exposure`) are
+    overwritten on every tick; copy them if they must outlive the next update.
+    """
+
+    def __init__(
+        self, tickers, pairs,
+        window=20,
+        entry_z=1.0,
+        exit_z=0.0,
+        hysteresis=False,
+        risk_aversion=1.0,
+        max_leverage=2.0,
+        history=None,
+        resync_every=1000
+    ):
+        """
+        Args:
+            tickers (list): Ticker order of the price vectors passed to update()
+            pairs (list of tuples): (ticker_a, ticker_b, beta, spread_mean, spread_std),
+                spread_mean/std being the reference statistics used for signals
+            window (int): Rolling z-score/volatility lookback in ticks
+            history (int): Ticks of prices kept per ticker (defaults to `window`)
+        """
+        if not pairs:
+            raise ValueError("LiveSignalEngine needs at least one pair.")
+
+        self.tickers = list(tickers)
+        columns = {t: k for k, t in enumerate(self.tickers)}
+        n = len(pairs)
+
+        self.window = window
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.hysteresis = hysteresis
+        self.risk_aversion = risk_aversion
+        self.max_leverage = max_leverage
+        self.resync_every = resync_every
+        self.ticks = 0
+
+        self.leg_a = np.array([columns[p[0]] for p in pairs], dtype=np.intp)
+        self.leg_b = np.array([columns[p[1]] for p in pairs], dtype=np.intp)
+        self.beta = np.array([p[2] for p in pairs], dtype=float)
+        self.ref_mean = np.array([p[3] for p in pairs], dtype=float)
+        self.ref_std = np.array([p[4] for p in pairs], dtype=float)
+        self.pairs = [PairState(self, k, p[0], p[1], self.beta[k]) for k, p in enumerate(pairs)]
+
+        self.prices = RingBuffer(history or window, len(self.tickers))
+        # Spreads are stored relative to the reference mean; variance is shift-invariant
+        self.spreads = RingBuffer(window, n)
+        self._sum = np.zeros(n)
+        self._sumsq = np.zeros(n)
+
+        # Outputs
+        self.spread = np.zeros(n)
+        self.zscore = np.zeros(n)
+        self.signal = np.zeros(n)
+        self.position_size = np.zeros(n)
+        self.exposure = np.zeros(n)
+
+        # Scratch
+        self._a = np.zeros(n)
+        self._b = np.zeros(n)
+        self._centered = np.zeros(n)
+        self._tmp = np.zeros(n)
+        self._std = np.zeros(n)
+        self._mask = np.zeros(n, dtype=bool)
+        self._squares = np.zeros((window, n))
+        self._short = np.zeros(n)
+        self._long = np.zeros(n)
+
+    @classmethod
+    def from_history(cls, price_df, pairs, **kwargs):
+        """
+        Fit hedge ratios and reference statistics on history, then warm the buffers
+        with its last `window` bars.
+
+        With hysteresis, the signal state entering the warm-up bars is taken from the
+        full history, so positions opened earlier are carried into live trading.
+
+        Args:
+            price_df (pd.DataFrame): Aligned historical prices
+            pairs (list of tuples): (ticker_a, ticker_b)
+            **kwargs: Passed to the constructor
+        """
+        specs = []
+        spreads = []
+        for A, B in pairs:
+            spread, beta = compute_spread(price_df[A], price_df[B])
+            specs.append((A, B, beta, np.mean(spread), np.std(spread)))
+            spreads.append(spread.to_numpy(dtype=float))
+
+        engine = cls(list(price_df.columns), specs, **kwargs)
+        warm = min(max(engine.prices.capacity, engine.window), len(price_df))
+
+        if engine.hysteresis and len(price_df) > warm:
+            thresholds = [(engine.entry_z, engine.exit_z)]
+            for k, spread in enumerate(spreads):
+                zscore = (spread[:-warm] - engine.ref_mean[k]) / engine.ref_std[k]
+                state = hysteresis_signal_grid(zscore, thresholds)[0, -1]
+                engine._short[k] = min(state, 0)
+                engine._long[k] = max(state, 0)
+
+        for row in price_df.to_numpy(dtype=float)[-warm:]:
+            engine.update(row)
+        return engine
+
+    def pair(self, name):
+        """
+        PairState for 'A/B'.
+        """
+        for state in self.pairs:
+            if state.name == name:
+                return state
+        raise KeyError(name)
+
+    def update(self, prices):
+        """
+        Process one tick.
+
+        Args:
+            prices (np.ndarray): Latest price per ticker, in `tickers` order
+
+        Returns:
+            np.ndarray: Target exposure per pair (the engine's `exposure` buffer)
+        """
+        self.prices.push(prices)
+        np.take(prices, self.leg_a, out=self._a)
+        np.take(prices, self.leg_b, out=self._b)
+        np.multiply(self.beta, self._b, out=self._tmp)
+        np.subtract(self._a, self._tmp, out=self.spread)
+        np.subtract(self.spread, self.ref_mean, out=self._centered)
+
+        self._roll(self._centered)
+        self._signals()
+        self._size()
+        self.ticks += 1
+        return self.exposure
+
+    def _roll(self, centered):
+        full = self.spreads.count == self.spreads.capacity
+        if full:
+            oldest = self.spreads.slot()
+            self._sum -= oldest
+            np.multiply(oldest, oldest, out=self._tmp)
+            self._sumsq -= self._tmp
+        self.spreads.push(centered)
+        self._sum += centered
+        np.multiply(centered, centered, out=self._tmp)
+        self._sumsq += self._tmp
+
+        if self.ticks % self.resync_every == self.resync_every - 1:
+            # Unfilled slots are zero, so full-ring sums are exact during warm-up too
+            np.sum(self.spreads.data, axis=0, out=self._sum)
+            np.multiply(self.spreads.data, self.spreads.data, out=self._squares)
+            np.sum(self._squares, axis=0, out=self._sumsq)
+
+    def _signals(self):
+        # Reference z-score, as generate_signals(spread, mean=ref_mean, std=ref_std)
+        z = self._tmp
+        np.divide(self._centered, self.ref_std, out=z)
+        entry, exit_, mask = self.entry_z, self.exit_z, self._mask
+
+        if self.hysteresis:
+            # Short: enter above entry, hold until z <= exit; long mirrors it
+            np.greater(z, entry, out=mask)
+            np.copyto(self._short, -1.0, where=mask)
+            np.less_equal(z, exit_, out=mask)
+            np.copyto(self._short, 0.0, where=mask)
+            np.less(z, -entry, out=mask)
+            np.copyto(self._long, 1.0, where=mask)
+            np.greater_equal(z, -exit_, out=mask)
+            np.copyto(self._long, 0.0, where=mask)
+            np.add(self._short, self._long, out=self.signal)
+            return
+
+        self.signal.fill(0.0)
+        np.greater(z, entry, out=mask)
+        np.copyto(self.signal, -1.0, where=mask)
+        np.less(z, -entry, out=mask)
+        np.copyto(self.signal, 1.0, where=mask)
+        np.absolute(z, out=z)
+        np.less(z, exit_, out=mask)
+        np.copyto(self.signal, 0.0, where=mask)
+
+    def _size(self):
+        # Rolling z-score and volatility-scaled size, as size_positions with ddof=1 std
+        n = self.spreads.count
+        if n < max(self.window, 2):
+            self.zscore.fill(0.0)
+            self.position_size.fill(0.0)
+            self.exposure.fill(0.0)
+            return
+
+        mean, std = self._tmp, self._std
+        np.divide(self._sum, n, out=mean)
+        np.multiply(self._sum, mean, out=std)
+        np.subtract(self._sumsq, std, out=std)
+        np.divide(std, n - 1, out=std)
+        np.maximum(std, 0.0, out=std)
+        np.sqrt(std, out=std)
+        std += 1e-6
+
+        np.subtract(self._centered, mean, out=self.zscore)
+        np.divide(self.zscore, std, out=self.zscore)
+
+        np.absolute(self.zscore, out=self.position_size)
+        np.divide(self.position_size, std, out=self.position_size)
+        self.position_size /= self.risk_aversion
+        np.minimum(self.position_size, self.max_leverage, out=self.position_size)
+        np.multiply(self.position_size, self.signal, out=self.exposure)
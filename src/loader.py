@@ -47,17 +47,20 @@ def download_prices(tickers, start="2015-01-01", end="2024-01-01", save=True, mo
             else:
                 try:
                     alpaca = tradeapi.REST(api_key, api_secret, base_url)
-                    now = datetime.utcnow().isoformat()
+                    now = pd.Timestamp.now()
+                    last_prices = {}
                     for ticker in tickers:
                         try:
                             barset = alpaca.get_bars(ticker, "1Min", limit=1).df
                             if barset.empty:
                                 raise ValueError("Empty barset")
                             last_price = barset["close"].iloc[-1]
-                            df.loc[pd.Timestamp.now(), ticker] = last_price
+                            last_prices[ticker] = last_price
                         except Exception as e:
                             print(f"[Error] Failed live fetch for {ticker}: {e}")
                             failed.append(ticker)
+                    # One row built at the end instead of growing the frame per ticker
+                    df = pd.DataFrame(last_prices, index=[now])
                 except Exception as e:
                     print(f"[Error] Alpaca API failure: {e}")
                     mode = "historical"
@@ -0,0 +1,273 @@
+import os
+import itertools
+import numpy as np
+import pandas as pd
+
+from src.coint import coint_stats
+
+INDEX_COLUMNS = [
+    "Pair", "Ticker1", "Ticker2", "Sector1", "Sector2",
+    "Correlation", "Beta", "HalfLife", "EG-Stat", "P-Value",
+    "Bars", "RefitBars", "LastRefit"
+]
+
+
+class PairStatsIndex:
+    """
+    On-disk index of pair-level statistics over a ticker universe.
+
+    Correlation, hedge ratio and half-life are derived for every pair at once from
+    per-ticker running sums (levels, lagged levels and first differences), which
+    are updated in O(new bars) as data arrives. The Engle-Granger test cannot be
+    maintained from sums, so it is refit per pair once `refit_every` new bars have
+    accumulated since that pair's last refit.
+
+    The sample is the price window last passed to update(): new bars are added and
+    bars that fall off the front of the window are subtracted, so the sums cover
+    the same bars the EG tests are refit on (up to `refit_every` bars apart).
+
+    Files: `<path>` (CSV table, one row per pair) and `<path>.sums.npz`, which also
+    holds the window's prices so leaving bars can be subtracted.
+    """
+
+    def __init__(self, path="results/pair_index.csv"):
+        self.path = path
+        self.table = pd.DataFrame(columns=INDEX_COLUMNS)
+        self.sums = None
+        if os.path.exists(path) and os.path.exists(self._sums_path):
+            self.table = pd.read_csv(path)
+            with np.load(self._sums_path, allow_pickle=False) as data:
+                self.sums = {key: data[key] for key in data.files}
+
+    @property
+    def _sums_path(self):
+        return f"{self.path}.sums.npz"
+
+    @property
+    def tickers(self):
+        return [] if self.sums is None else [str(t) for t in self.sums["tickers"]]
+
+    def update(self, price_df, sectors=None, refit_every=20, min_correlation=0.0, n_jobs=1, executor=None):
+        """
+        Fold new bars of `price_df` into the index and refit stale pairs.
+
+        Args:
+            price_df (pd.DataFrame): Aligned price window (rows already indexed are
+                skipped, indexed rows before its first bar are removed; a changed
+                ticker set or a window starting earlier than the index triggers a rebuild)
+            sectors (dict): Optional ticker -> sector label
+            refit_every (int): New bars after which a pair's EG test is refit
+            min_correlation (float): Skip EG refits for pairs with |correlation| below this
+            n_jobs (int): Worker processes for EG refits
+            executor (Executor): Backend for EG refits; overrides n_jobs
+
+        Returns:
+            PairStatsIndex: self
+        """
+        # UTC nanoseconds, comparable with the stored bar stamps whatever the index unit/tz
+        stamps = pd.DatetimeIndex(price_df.index).as_unit("ns").asi8
+        rebuild = (
+            self.sums is None
+            or "bar_stamps" not in self.sums
+            or self.tickers != list(map(str, price_df.columns))
+        )
+        if not rebuild:
+            indexed = self.sums["bar_stamps"]
+            # The window must start at or after the indexed bars and overlap them
+            rebuild = not len(indexed) or stamps[0] < indexed[0] or stamps[0] > indexed[-1] \
+                or stamps[-1] < indexed[-1]
+
+        if rebuild:
+            self._reset(price_df)
+            new_rows = price_df
+        else:
+            self._drop(int(np.searchsorted(self.sums["bar_stamps"], stamps[0])))
+            new_rows = price_df[stamps > self.sums["bar_stamps"][-1]]
+
+        if len(new_rows):
+            self._accumulate(new_rows.to_numpy(dtype=float), stamps[-len(new_rows):])
+
+        self._refresh_table(sectors or {})
+        self._refit(price_df, refit_every, min_correlation, n_jobs, executor)
+        return self
+
+    def _reset(self, price_df):
+        k = price_df.shape[1]
+        self.sums = {
+            "tickers": np.array(list(map(str, price_df.columns))),
+            "pivot": price_df.iloc[0].to_numpy(dtype=float),
+            "last_row": np.full(k, np.nan),
+            "prices": np.empty((0, k)),
+            "bar_stamps": np.empty(0, dtype=np.int64),
+            "seen": np.int64(0),
+            "n": np.int64(0),
+            "s": np.zeros(k),
+            "ss": np.zeros((k, k)),
+            "m": np.int64(0),
+            "s_lag": np.zeros(k),
+            "s_diff": np.zeros(k),
+            "ll": np.zeros((k, k)),
+            "dl": np.zeros((k, k)),
+        }
+        self.table = pd.DataFrame(columns=INDEX_COLUMNS)
+
+    def _accumulate(self, prices, stamps):
+        sums = self.sums
+        levels = prices - sums["pivot"]
+        sums["prices"] = np.vstack([sums["prices"], prices])
+        sums["bar_stamps"] = np.concatenate([sums["bar_stamps"], stamps])
+        sums["seen"] = sums["seen"] + len(levels)
+
+        sums["n"] = sums["n"] + len(levels)
+        sums["s"] = sums["s"] + levels.sum(axis=0)
+        sums["ss"] = sums["ss"] + levels.T @ levels
+
+        # Lag/difference pairs, continuing from the last bar of the previous update
+        if not np.isnan(sums["last_row"]).any():
+            levels = np.vstack([sums["last_row"] - sums["pivot"], levels])
+        lag = levels[:-1]
+        diff = np.diff(levels, axis=0)
+        sums["m"] = sums["m"] + len(diff)
+        sums["s_lag"] = sums["s_lag"] + lag.sum(axis=0)
+        sums["s_diff"] = sums["s_diff"] + diff.sum(axis=0)
+        sums["ll"] = sums["ll"] + lag.T @ lag
+        sums["dl"] = sums["dl"] + diff.T @ lag
+        sums["last_row"] = prices[-1]
+
+    def _drop(self, count):
+        """
+        Subtract the oldest `count` bars (and their lag/difference pairs) from the sums.
+        """
+        if count <= 0:
+            return
+        sums = self.sums
+        levels = sums["prices"][:count + 1] - sums["pivot"]
+        leaving = levels[:count]
+
+        sums["n"] = sums["n"] - count
+        sums["s"] = sums["s"] - leaving.sum(axis=0)
+        sums["ss"] = sums["ss"] - leaving.T @ leaving
+
+        # Pairs (t-1, t) whose lag is a leaving bar; t is the next bar in the window
+        diff = np.diff(levels, axis=0)
+        sums["m"] = sums["m"] - len(diff)
+        sums["s_lag"] = sums["s_lag"] - leaving.sum(axis=0)
+        sums["s_diff"] = sums["s_diff"] - diff.sum(axis=0)
+        sums["ll"] = sums["ll"] - leaving.T @ leaving
+        sums["dl"] = sums["dl"] - diff.T @ leaving
+
+        sums["prices"] = sums["prices"][count:]
+        sums["bar_stamps"] = sums["bar_stamps"][count:]
+
+    def _refresh_table(self, sectors):
+        """
+        Recompute correlation, beta and half-life for every pair from the sums.
+        """
+        sums = self.sums
+        tickers = self.tickers
+        n, m = sums["n"], sums["m"]
+        pairs = np.array(list(itertools.combinations(range(len(tickers)), 2)), dtype=int).reshape(-1, 2)
+        I, J = pairs[:, 0], pairs[:, 1]
+
+        mean = sums["s"] / n
+        cov = sums["ss"] / n - np.outer(mean, mean)
+        var = np.diag(cov)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = cov[I, J] / np.sqrt(var[I] * var[J])
+            # compute_spread regresses Ticker1 on Ticker2
+            beta = cov[I, J] / var[J]
+
+            mean_lag = sums["s_lag"] / m
+            mean_diff = sums["s_diff"] / m
+            c_dl = sums["dl"] / m - np.outer(mean_diff, mean_lag)
+            v_ll = sums["ll"] / m - np.outer(mean_lag, mean_lag)
+            # AR(1) slope of the spread y - beta * x, as in estimate_half_life
+            num = c_dl[I, I] - beta * c_dl[I, J] - beta * c_dl[J, I] + beta ** 2 * c_dl[J, J]
+            den = v_ll[I, I] - 2 * beta * v_ll[I, J] + beta ** 2 * v_ll[J, J]
+            slope = num / den
+            half_life = np.where(slope < 0, -np.log(2) / slope, np.nan)
+
+        names = [f"{tickers[i]}/{tickers[j]}" for i, j in pairs]
+        fresh = pd.DataFrame({
+            "Pair": names,
+            "Ticker1": [tickers[i] for i in I],
+            "Ticker2": [tickers[j] for j in J],
+            "Sector1": [sectors.get(tickers[i]) for i in I],
+            "Sector2": [sectors.get(tickers[j]) for j in J],
+            "Correlation": correlation,
+            "Beta": beta,
+            "HalfLife": half_life,
+            "Bars": int(n)
+        })
+
+        # Keep EG results and refit bookkeeping from the previous table
+        carried = ["EG-Stat", "P-Value", "RefitBars", "LastRefit"]
+        if not sectors:
+            carried += ["Sector1", "Sector2"]
+            fresh = fresh.drop(columns=["Sector1", "Sector2"])
+        previous = self.table.set_index("Pair")[carried] if len(self.table) else pd.DataFrame(columns=carried)
+        self.table = fresh.join(previous, on="Pair")[INDEX_COLUMNS]
+
+    def _refit(self, price_df, refit_every, min_correlation, n_jobs, executor=None):
+        table = self.table
+        # RefitBars counts all bars folded in so far, so refits stay due as the window rolls
+        seen = int(self.sums["seen"])
+        refit_bars = table["RefitBars"].fillna(-np.inf).astype(float)
+        due = (seen - refit_bars >= refit_every) | table["P-Value"].isna()
+        due &= table["Correlation"].abs() >= min_correlation
+        if not due.any():
+            return
+
+        columns = {t: k for k, t in enumerate(map(str, price_df.columns))}
+        rows = np.flatnonzero(due.to_numpy())
+        index_pairs = [(columns[table["Ticker1"].iat[r]], columns[table["Ticker2"].iat[r]]) for r in rows]
+        stats = coint_stats(price_df, index_pairs, n_jobs=n_jobs, executor=executor)
+
+        table.loc[table.index[rows], "EG-Stat"] = stats[:, 0]
+        table.loc[table.index[rows], "P-Value"] = stats[:, 1]
+        table.loc[table.index[rows], "RefitBars"] = seen
+        table.loc[table.index[rows], "LastRefit"] = pd.Timestamp(price_df.index[-1]).isoformat()
+        print(f"[Pair Index] Refit {len(rows)}/{len(table)} pairs.")
+
+    def query(self, max_half_life=None, max_pvalue=None, min_correlation=None, sector=None, top_k=None):
+        """
+        Filter pairs without touching price data.
+
+        Example: query(max_half_life=10, max_pvalue=0.05, sector="Semis")
+
+        Args:
+            max_half_life (float): Keep pairs that mean-revert faster than this (bars)
+            max_pvalue (float): Keep pairs with EG p-value below this
+            min_correlation (float): Keep pairs with correlation at least this
+            sector (str): Keep pairs with both legs in this sector
+            top_k (int): Keep the K lowest p-values
+
+        Returns:
+            pd.DataFrame: Matching rows sorted by p-value
+        """
+        table = self.table
+        mask = pd.Series(True, index=table.index)
+        if max_half_life is not None:
+            mask &= table["HalfLife"] < max_half_life
+        if max_pvalue is not None:
+            mask &= table["P-Value"] < max_pvalue
+        if min_correlation is not None:
+            mask &= table["Correlation"] >= min_correlation
+        if sector is not None:
+            mask &= (table["Sector1"] == sector) & (table["Sector2"] == sector)
+
+        result = table[mask].sort_values("P-Value", kind="stable")
+        return result.head(top_k) if top_k is not None else result
+
+    def lookup(self, A, B):
+        """
+        Row for pair A/B as a dict, or None if not indexed.
+        """
+        rows = self.table[self.table["Pair"] == f"{A}/{B}"]
+        return None if rows.empty else rows.iloc[0].to_dict()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.table.to_csv(self.path, index=False)
+        np.savez(self._sums_path, **self.sums)
+        print(f"[Saved] Pair statistics index to '{self.path}'")
@@ -0,0 +1,226 @@
+import os
+import json
+import uuid
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+
+class SharedPricePanel:
+    """
+    Read-only aligned price matrix shared across processes without copying.
+
+    Prices are stored once, ticker-major (one contiguous row per ticker), either in
+    a POSIX shared-memory segment or in a memory-mapped .npy file. Workers attach
+    with the picklable `spec` and address tickers by column index.
+    """
+
+    def __init__(self, values, index_values, tickers, spec, handles=(), owner=False):
+        self.values = values
+        self._index_values = index_values
+        self._index = None
+        self.tickers = list(tickers)
+        self.spec = spec
+        self._handles = list(handles)
+        self._owner = owner
+        self._columns = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def create(cls, price_df, path=None):
+        """
+        Copy a price DataFrame into shared storage.
+
+        Args:
+            price_df (pd.DataFrame): Aligned prices, one column per ticker
+            path (str): Optional .npy path for a memory-mapped file instead of shared memory
+
+        Returns:
+            SharedPricePanel: Owning handle; call unlink() (or use as a context manager) when done
+        """
+        index_values, index_tz = _encode_index(price_df.index)
+        data = np.ascontiguousarray(price_df.to_numpy(dtype=np.float64).T)
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            values = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=data.shape)
+            values[:] = data
+            values.flush()
+            np.save(f"{path}.index.npy", index_values)
+            spec = _memmap_spec(path, index_tz, list(price_df.columns))
+            with open(spec["meta_path"], "w") as f:
+                json.dump({"tz": index_tz, "tickers": spec["tickers"]}, f)
+            del values
+            panel = cls.attach(spec)
+            panel._owner = True
+            return panel
+
+        name = f"statarb_{uuid.uuid4().hex[:12]}"
+        value_shm = shared_memory.SharedMemory(name=name, create=True, size=max(data.nbytes, 1))
+        index_shm = shared_memory.SharedMemory(name=f"{name}_idx", create=True,
+                                               size=max(index_values.nbytes, 1))
+        values = np.ndarray(data.shape, dtype=np.float64, buffer=value_shm.buf)
+        values[:] = data
+        np.ndarray(index_values.shape, dtype=np.int64, buffer=index_shm.buf)[:] = index_values
+
+        spec = {
+            "kind": "shm",
+            "name": name,
+            "shape": data.shape,
+            "tz": index_tz,
+            "tickers": list(price_df.columns)
+        }
+        return cls._from_shm(spec, value_shm, index_shm, owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Attach to a panel created in another process.
+
+        Pool workers share the creator's resource tracker, so attaching does not
+        transfer ownership; only the creator's unlink() releases the segments.
+        """
+        if spec["kind"] == "memmap":
+            values = np.load(spec["path"], mmap_mode="r")
+            index_values = np.load(spec["index_path"], mmap_mode="r")
+            return cls(values, index_values, spec["tickers"], spec)
+
+        value_shm = shared_memory.SharedMemory(name=spec["name"])
+        index_shm = shared_memory.SharedMemory(name=f"{spec['name']}_idx")
+        return cls._from_shm(spec, value_shm, index_shm, owner=False)
+
+    @classmethod
+    def _from_shm(cls, spec, value_shm, index_shm, owner):
+        values = np.ndarray(spec["shape"], dtype=np.float64, buffer=value_shm.buf)
+        values.flags.writeable = False
+        n_bars = spec["shape"][1]
+        index_values = np.ndarray((n_bars,), dtype=np.int64, buffer=index_shm.buf).copy()
+        return cls(values, index_values, spec["tickers"], spec, (value_shm, index_shm), owner)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a panel previously written with create(path=...), e.g. by another run.
+        """
+        with open(f"{path}.meta.json") as f:
+            meta = json.load(f)
+        return cls.attach(_memmap_spec(path, meta["tz"], meta["tickers"]))
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = _decode_index(np.asarray(self._index_values), self.spec["tz"])
+        return self._index
+
+    def __len__(self):
+        return len(self._index_values)
+
+    def column_index(self, ticker):
+        return self._columns[ticker]
+
+    def series(self, col):
+        """
+        Zero-copy Series view of one ticker, addressed by column index or name.
+        """
+        if not isinstance(col, (int, np.integer)):
+            col = self._columns[col]
+        return pd.Series(self.values[col], index=self.index, name=self.tickers[col], copy=False)
+
+    def frame(self, cols=None):
+        """
+        DataFrame of the selected tickers (all by default).
+        """
+        cols = range(len(self.tickers)) if cols is None else cols
+        return pd.concat([self.series(c) for c in cols], axis=1)
+
+    def chunk(self, start, stop, cols=None):
+        """
+        Copy bars [start, stop) of the selected tickers into a DataFrame.
+
+        Only the requested slice of the index is decoded, so memory is bounded by
+        the chunk rather than the full history.
+        """
+        cols = list(range(len(self.tickers))) if cols is None else [
+            c if isinstance(c, (int, np.integer)) else self._columns[c] for c in cols
+        ]
+        index = _decode_index(np.asarray(self._index_values[start:stop]), self.spec["tz"])
+        data = np.asarray(self.values[cols, start:stop]).T
+        return pd.DataFrame(data, index=index, columns=[self.tickers[c] for c in cols])
+
+    def close(self):
+        """
+        Detach this process from the shared storage.
+        """
+        self.values = None
+        for shm in self._handles:
+            try:
+                shm.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is released with it
+                pass
+
+    def unlink(self):
+        """
+        Detach and release the shared storage. Only the creating process unlinks.
+        """
+        self.close()
+        if not self._owner:
+            return
+        if self.spec["kind"] == "shm":
+            for shm in self._handles:
+                shm.unlink()
+        else:
+            for path in (self.spec["path"], self.spec["index_path"], self.spec["meta_path"]):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._handles = []
+        self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
+
+
+def _memmap_spec(path, tz, tickers):
+    return {
+        "kind": "memmap",
+        "path": path,
+        "index_path": f"{path}.index.npy",
+        "meta_path": f"{path}.meta.json",
+        "tz": tz,
+        "tickers": tickers
+    }
+
+
+def _encode_index(index):
+    if isinstance(index, pd.DatetimeIndex):
+        tz = str(index.tz) if index.tz is not None else None
+        return index.as_unit("ns").asi8.copy(), tz
+    if pd.api.types.is_integer_dtype(index):
+        return np.asarray(index, dtype=np.int64), "int"
+    raise ValueError("SharedPricePanel requires a DatetimeIndex or integer index.")
+
+
+def _decode_index(values, tz):
+    if tz == "int":
+        return pd.Index(values)
+    index = pd.DatetimeIndex(values.astype("datetime64[ns]"))
+    return index.tz_localize("UTC").tz_convert(tz) if tz else index
+
+
+# Panels attached in the current worker, keyed by field ('close', 'open', 'volume')
+_WORKER_PANELS = {}
+
+
+def worker_panel(field="close"):
+    """
+    Panel attached in the current process by the running executor (see src.executors).
+    """
+    return _WORKER_PANELS.get(field)
+
+
+def _attach_worker(specs):
+    for field, spec in specs.items():
+        _WORKER_PANELS[field] = SharedPricePanel.attach(spec)
+
@@ -0,0 +1,205 @@
+import pandas as pd
+
+from src.strategy import compute_spread, generate_signals
+from src.backtest import backtest_pair, compute_metrics
+from src.chunked import run_chunked_backtest
+from src.features import extract_features
+from src.panel import SharedPricePanel, worker_panel
+from src.executors import run_pair_tasks
+from src.sessions import effective_freq, periods_per_year, window_bars
+
+
+def evaluate_pair(
+    series_A, series_B, pval, config,
+    execution=None,
+    open_A=None, open_B=None,
+    volume_A=None, volume_B=None,
+    pair_stats=None,
+    adj_pval=None
+):
+    """
+    Run spread estimation, signal generation, backtest and feature extraction for one pair.
+
+    `pval` is the raw cointegration p-value (an ML feature); `adj_pval`, the
+    multiple-testing adjusted one, is reported in the summary only.
+
+    `pair_stats` is an optional PairStatsIndex row whose half-life is reused; the index
+    covers the same price window as the series passed here.
+
+    With the "chunked" config block enabled, the backtest streams from the on-disk
+    price store straight to `results/` and `logs/`, metrics are accumulated per
+    chunk and no results frame is returned.
+
+    Returns:
+        tuple: (metrics dict, features dict, results DataFrame or None when chunked)
+    """
+    A, B = series_A.name, series_B.name
+    freq = effective_freq(config)
+    window = window_bars(config.get("window_days", 20), freq)
+
+    spread, beta = compute_spread(series_A, series_B)
+    signals = generate_signals(
+        spread,
+        entry_z=config.get("entry_z", 1.0),
+        exit_z=config.get("exit_z", 0.0),
+        hysteresis=config.get("signal_hysteresis", False)
+    )
+
+    chunked_cfg = config.get("chunked") or {}
+    if chunked_cfg.get("enabled", False):
+        # Stream the pair from the on-disk store written by main.py
+        if execution is not None:
+            raise ValueError("The chunked backtest does not support the execution simulator.")
+        results = None
+        metrics = run_chunked_backtest(
+            chunked_cfg.get("path", "data/price_store.npy"), A, B,
+            periods_per_year=periods_per_year(freq),
+            chunk_size=chunked_cfg.get("chunk_size", 100_000),
+            capital_base=config.get("capital", 1_000_000),
+            risk_aversion=config.get("risk_aversion", 1.0),
+            slippage_pct=config.get("slippage", 0.0005),
+            transaction_cost_pct=config.get("txn_cost", 0.001),
+            max_leverage=config.get("max_leverage", 2.0),
+            stop_loss_pct=config.get("stop_loss", None),
+            window=window,
+            entry_z=config.get("entry_z", 1.0),
+            exit_z=config.get("exit_z", 0.0),
+            hysteresis=config.get("signal_hysteresis", False),
+            trailing_stop_pct=config.get("trailing_stop", None),
+            max_holding_bars=config.get("max_holding_bars", None),
+            cooldown_bars=config.get("cooldown_bars", 0),
+            stop_loss_exit=config.get("stop_loss_exit", False)
+        )
+    else:
+        results = backtest_pair(
+            series_A, series_B, signals, beta,
+            capital_base=config.get("capital", 1_000_000),
+            risk_aversion=config.get("risk_aversion", 1.0),
+            slippage_pct=config.get("slippage", 0.0005),
+            transaction_cost_pct=config.get("txn_cost", 0.001),
+            max_leverage=config.get("max_leverage", 2.0),
+            stop_loss_pct=config.get("stop_loss", None),
+            execution=execution,
+            open1=open_A,
+            open2=open_B,
+            volume1=volume_A,
+            volume2=volume_B,
+            window=window,
+            trailing_stop_pct=config.get("trailing_stop", None),
+            max_holding_bars=config.get("max_holding_bars", None),
+            cooldown_bars=config.get("cooldown_bars", 0),
+            stop_loss_exit=config.get("stop_loss_exit", False)
+        )
+
+        if not isinstance(results.index, pd.DatetimeIndex):
+            results.index = series_A.index[1:]
+
+        metrics = compute_metrics(results, periods_per_year=periods_per_year(freq))
+
+    metrics.update({
+        "Pair": f"{A}/{B}",
+        "Beta": round(beta, 4),
+        "P-Value": round(pval, 4),
+        "Adj P-Value": round(pval if adj_pval is None else adj_pval, 4)
+    })
+
+    half_life = pair_stats.get("HalfLife") if pair_stats else None
+    if half_life is not None and pd.isna(half_life):
+        half_life = None
+    features = extract_features(series_A, series_B, spread, signals, beta, pval,
+                                window=window, half_life=half_life)
+    features["Pair"] = f"{A}/{B}"
+
+    return metrics, features, results
+
+
+def evaluate_pair_task(i, j, pval, config, execution=None, pair_stats=None, adj_pval=None):
+    """
+    Worker entry point: evaluate the pair at panel columns (i, j).
+
+    Returns:
+        tuple or None: evaluate_pair output, or None if the pair failed
+    """
+    close = worker_panel("close")
+    opens = worker_panel("open")
+    volumes = worker_panel("volume")
+    A, B = close.tickers[i], close.tickers[j]
+
+    try:
+        return evaluate_pair(
+            close.series(i), close.series(j), pval, config,
+            execution=execution,
+            open_A=opens.series(i) if opens is not None else None,
+            open_B=opens.series(j) if opens is not None else None,
+            volume_A=volumes.series(i) if volumes is not None else None,
+            volume_B=volumes.series(j) if volumes is not None else None,
+            pair_stats=pair_stats,
+            adj_pval=adj_pval
+        )
+    except Exception as e:
+        print(f"[Error] Backtest failed for pair {A}/{B}: {e}")
+        return None
+
+
+def evaluate_pairs(
+    price_df, coint_pairs, config,
+    execution=None, open_df=None, volume_df=None, n_jobs=1, pair_index=None, executor=None
+):
+    """
+    Evaluate every cointegrated pair, sharing price panels across worker processes.
+
+    Args:
+        price_df (pd.DataFrame): Aligned close prices
+        coint_pairs (list): (ticker1, ticker2, p-value, adjusted p-value) tuples from
+            find_cointegrated_pairs
+        config (dict): Experiment config
+        execution (ExecutionSimulator): Optional fill model
+        open_df, volume_df (pd.DataFrame): Optional opens/volumes for the fill model
+        n_jobs (int): Worker processes (1 = in-process)
+        pair_index (PairStatsIndex): Optional index to read per-pair statistics from
+        executor (Executor): Backend for the per-pair work (see src.executors); overrides n_jobs
+
+    Returns:
+        list of tuples: (ticker1, ticker2, evaluate_pair output or None)
+    """
+    def stats_for(A, B):
+        return pair_index.lookup(A, B) if pair_index is not None else None
+
+    if n_jobs <= 1 and executor is None:
+        outputs = []
+        for A, B, pval, adj_pval in coint_pairs:
+            try:
+                outputs.append((A, B, evaluate_pair(
+                    price_df[A], price_df[B], pval, config,
+                    execution=execution,
+                    open_A=open_df[A] if open_df is not None else None,
+                    open_B=open_df[B] if open_df is not None else None,
+                    volume_A=volume_df[A] if volume_df is not None else None,
+                    volume_B=volume_df[B] if volume_df is not None else None,
+                    pair_stats=stats_for(A, B),
+                    adj_pval=adj_pval
+                )))
+            except Exception as e:
+                print(f"[Error] Backtest failed for pair {A}/{B}: {e}")
+                outputs.append((A, B, None))
+        return outputs
+
+    frames = {"close": price_df, "open": open_df, "volume": volume_df}
+    panels = {}
+    try:
+        for field, frame in frames.items():
+            if frame is not None:
+                panels[field] = SharedPricePanel.create(frame.reindex(price_df.index)[price_df.columns])
+
+        columns = {t: k for k, t in enumerate(price_df.columns)}
+        tasks = [
+            (columns[A], columns[B], pval, config, execution, stats_for(A, B), adj_pval)
+            for A, B, pval, adj_pval in coint_pairs
+        ]
+        outputs = run_pair_tasks(panels, evaluate_pair_task, tasks, n_jobs=n_jobs, chunksize=1,
+                                 executor=executor)
+    finally:
+        for panel in panels.values():
+            panel.unlink()
+
+    return [(A, B, out) for (A, B, *_), out in zip(coint_pairs, outputs)]
@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+
+import pandas as pd
+
+# Keys that change how a run executes but not what it computes
+VOLATILE_KEYS = {"n_jobs", "registry", "executor"}
+
+
+def _strip_volatile(config):
+    if isinstance(config, dict):
+        return {k: _strip_volatile(v) for k, v in config.items() if k not in VOLATILE_KEYS}
+    if isinstance(config, list):
+        return [_strip_volatile(v) for v in config]
+    return config
+
+
+def _flatten(config, prefix=""):
+    flat = {}
+    for key, value in config.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def config_hash(config):
+    """
+    Content hash of the result-affecting part of a config (key order ignored).
+    """
+    canonical = json.dumps(_strip_volatile(config), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def data_fingerprint(price_df):
+    """
+    Content hash of a price panel: tickers, timestamps and values.
+
+    Returns:
+        str: sha256 hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(map(str, price_df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(price_df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_fingerprints(paths):
+    """
+    Content hash of each input file a run reads besides prices (model pickles,
+    the pair index).
+
+    Returns:
+        dict: path -> sha256 hex digest, or None for a missing file
+    """
+    out = {}
+    for path in sorted(paths):
+        if not os.path.exists(path):
+            out[path] = None
+            continue
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        out[path] = digest.hexdigest()
+    return out
+
+
+def run_key(config, price_df, code=None, inputs=None):
+    """
+    Run identifier: short hash of config hash + data fingerprint + code version
+    (see code_version) + input file fingerprints (see file_fingerprints).
+    """
+    combined = ":".join([
+        config_hash(config),
+        data_fingerprint(price_df),
+        code or "",
+        json.dumps(inputs or {}, sort_keys=True),
+    ])
+    return hashlib.sha256(combined.encode()).hexdigest()[:16]
+
+
+class StageTimer:
+    """
+    Wall-clock timings of consecutive pipeline stages.
+
+    Example: timer.lap("data") records the seconds since the previous lap.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.timings[stage] = round(now - self._last, 4)
+        self._last = now
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def code_version():
+    """
+    HEAD commit, suffixed with a hash of uncommitted changes to tracked Python files.
+
+    Returns:
+        str or None: None outside a git checkout
+    """
+    commit = _git_commit()
+    if commit is None:
+        return None
+    try:
+        out = subprocess.run(["git", "diff", "HEAD", "--", "*.py"], capture_output=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if out.returncode != 0:
+        return None
+    return f"{commit}+{hashlib.sha256(out.stdout).hexdigest()[:12]}" if out.stdout else commit
+
+
+class RunRegistry:
+    """
+    Content-addressed store of pipeline runs.
+
+    Each run lives in `<root>/<key>/`, where the key hashes the config (minus
+    VOLATILE_KEYS) together with fingerprints of the price data, the code version
+    and the input files (model pickles, pair index), so only an identical
+    experiment on identical data, code and models maps to the same entry. A run holds
+    `manifest.json` (config, fingerprints, metadata, stage timings, artifact
+    pointers) and copies of its artifacts under `artifacts/`.
+    """
+
+    def __init__(self, root="runs"):
+        self.root = root
+
+    def _run_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _manifest_path(self, key):
+        return os.path.join(self._run_dir(key), "manifest.json")
+
+    def exists(self, key):
+        return os.path.exists(self._manifest_path(key))
+
+    def manifest(self, key):
+        """
+        Stored manifest for run `key` (a unique key prefix is accepted).
+        """
+        key = self.resolve(key)
+        with open(self._manifest_path(key), "r") as f:
+            return json.load(f)
+
+    def resolve(self, prefix):
+        """
+        Expand a key prefix to the full run key.
+
+        Raises:
+            KeyError: No run, or more than one run, matches the prefix
+        """
+        matches = [k for k in self.keys() if k.startswith(prefix)]
+        if len(matches) != 1:
+            raise KeyError(f"{'No' if not matches else 'Ambiguous'} run matching '{prefix}'.")
+        return matches[0]
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(k for k in os.listdir(self.root) if self.exists(k))
+
+    def record(self, key, config, price_df, artifacts, timings=None, metadata=None, code=None, inputs=None):
+        """
+        Store a finished run: copy its artifacts and write the manifest.
+
+        Args:
+            key (str): run_key(config, price_df)
+            config (dict): Experiment config
+            price_df (pd.DataFrame): Price panel the run used
+            artifacts (list): Output file paths to keep (missing files are skipped)
+            timings (dict): Stage -> seconds
+            metadata (dict): Extra fields (e.g. pair count)
+            code (str): code_version() the key was built with
+            inputs (dict): file_fingerprints() the key was built with
+
+        Returns:
+            dict: The written manifest
+        """
+        run_dir = self._run_dir(key)
+        stored = {}
+        for path in artifacts:
+            if not os.path.exists(path):
+                continue
+            target = os.path.join(run_dir, "artifacts", os.path.relpath(path))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target)
+            stored[path] = os.path.relpath(target, run_dir)
+
+        manifest = {
+            "key": key,
+            "created": pd.Timestamp.now(tz="UTC").isoformat(),
+            "git_commit": _git_commit(),
+            "code_version": code,
+            "config_hash": config_hash(config),
+            "data_fingerprint": data_fingerprint(price_df),
+            "inputs": inputs or {},
+            "data": {
+                "tickers": list(map(str, price_df.columns)),
+                "bars": int(len(price_df)),
+                "start": str(price_df.index[0]) if len(price_df) else None,
+                "end": str(price_df.index[-1]) if len(price_df) else None,
+            },
+            "config": config,
+            "timings": timings or {},
+            "metadata": metadata or {},
+            "artifacts": stored,
+        }
+        os.makedirs(run_dir, exist_ok=True)
+        with open(self._manifest_path(key), "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        print(f"[Registry] Recorded run {key} ({len(stored)} artifacts).")
+        return manifest
+
+    def restore(self, key):
+        """
+        Serve a stored run by copying its artifacts back to their original paths.
+
+        Returns:
+            dict: The run manifest
+        """
+        manifest = self.manifest(key)
+        run_dir = self._run_dir(manifest["key"])
+        for path, stored in manifest["artifacts"].items():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            shutil.copy2(os.path.join(run_dir, stored), path)
+        print(f"[Registry] Restored {len(manifest['artifacts'])} artifacts from run {manifest['key']}.")
+        return manifest
+
+    def artifact(self, key, path):
+        """
+        Location of a stored artifact, by its original path.
+        """
+        manifest = self.manifest(key)
+        return os.path.join(self._run_dir(manifest["key"]), manifest["artifacts"][path])
+
+    def summary(self, key, path="results/strategy_summary.csv"):
+        return pd.read_csv(self.artifact(key, path))
+
+    def list_runs(self):
+        """
+        Returns:
+            pd.DataFrame: One row per stored run, newest first
+        """
+        rows = []
+        for key in self.keys():
+            manifest = self.manifest(key)
+            rows.append({
+                "Run": key,
+                "Created": manifest["created"],
+                "Tickers": len(manifest["data"]["tickers"]),
+                "Bars": manifest["data"]["bars"],
+                "Pairs": manifest["metadata"].get("pairs"),
+                "Total Time (s)": round(sum(manifest["timings"].values()), 2),
+            })
+        columns = ["Run", "Created", "Tickers", "Bars", "Pairs", "Total Time (s)"]
+        return pd.DataFrame(rows, columns=columns).sort_values("Created", ascending=False)
+
+    def config_diff(self, key_a, key_b):
+        """
+        Config keys (dotted for nested blocks) whose values differ between two runs.
+
+        Returns:
+            dict: key -> (value in run A, value in run B)
+        """
+        a = _flatten(self.manifest(key_a)["config"])
+        b = _flatten(self.manifest(key_b)["config"])
+        return {k: (a.get(k), b.get(k)) for k in sorted(set(a) | set(b)) if a.get(k) != b.get(k)}
+
+    def diff(self, key_a, key_b, metrics=None):
+        """
+        Per-pair metric differences between two runs' strategy summaries.
+
+        Args:
+            key_a, key_b (str): Run keys (or unique prefixes)
+            metrics (list): Metric columns to compare (default: all numeric columns)
+
+        Returns:
+            pd.DataFrame: Pair, Metric, Run A, Run B, Delta; pairs present in only one
+            run have NaN on the other side
+        """
+        a = self.summary(key_a).set_index("Pair")
+        b = self.summary(key_b).set_index("Pair")
+        if metrics is None:
+            numeric = a.select_dtypes("number").columns
+            metrics = [m for m in numeric if m in b.columns]
+
+        merged = a[metrics].join(b[metrics], how="outer", lsuffix=" A", rsuffix=" B")
+        rows = []
+        for metric in metrics:
+            rows.append(pd.DataFrame({
+                "Pair": merged.index,
+                "Metric": metric,
+                "Run A": merged[f"{metric} A"].to_numpy(),
+                "Run B": merged[f"{metric} B"].to_numpy(),
+            }))
+        out = pd.concat(rows, ignore_index=True)
+        out["Delta"] = out["Run B"] - out["Run A"]
+        return out.sort_values(["Pair", "Metric"], ignore_index=True)
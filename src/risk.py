@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+
+def stack_results(results_by_pair, field):
+    """
+    Align one backtest column across pairs into a (bars x pairs) frame.
+
+    Args:
+        results_by_pair (dict): Pair name -> backtest_pair results
+        field (str): Column to stack, e.g. 'PnL', 'Capital', 'Exposure'
+
+    Returns:
+        pd.DataFrame: Union of bar indices; NaN where a pair has no bar
+    """
+    return pd.DataFrame({pair: res[field] for pair, res in results_by_pair.items()})
+
+
+def _rolling_sums(values, window):
+    """
+    Trailing-window sums along axis 0 via cumulative sums (NaN counted as 0).
+    """
+    filled = np.where(np.isnan(values), 0.0, values)
+    csum = np.cumsum(filled, axis=0)
+    out = csum.copy()
+    out[window:] -= csum[:-window]
+    return out
+
+
+def rolling_sharpe(pnl, window=63, periods_per_year=252):
+    """
+    Annualized rolling Sharpe of per-bar PnL for every pair at once.
+
+    Each column is de-meaned before the cumulative sums so the variance
+    (sum of squares minus squared sum) does not lose precision on long histories.
+
+    Args:
+        pnl (pd.DataFrame): (bars x pairs) PnL
+        window (int): Lookback in bars
+        periods_per_year (int): Bars per year
+
+    Returns:
+        pd.DataFrame: NaN until a pair has `window` observations in the lookback
+    """
+    values = pnl.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    centered = values - np.nanmean(values, axis=0)
+
+    count = _rolling_sums(valid.astype(float), window)
+    s1 = _rolling_sums(centered, window)
+    s2 = _rolling_sums(centered ** 2, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / count
+        var = (s2 - s1 * mean) / (count - 1)
+        sharpe = (mean + np.nanmean(values, axis=0)) / np.sqrt(var) * np.sqrt(periods_per_year)
+    sharpe[(count < window) | ~(var > 0)] = np.nan
+    return pd.DataFrame(sharpe, index=pnl.index, columns=pnl.columns)
+
+
+def drawdowns(capital):
+    """
+    Drawdown depth and duration series for every pair.
+
+    Args:
+        capital (pd.DataFrame): (bars x pairs) capital paths
+
+    Returns:
+        dict: 'Drawdown' (peak minus capital, as in compute_metrics),
+        'Drawdown (%)' and 'Duration' (bars since the last peak) frames
+    """
+    values = capital.to_numpy(dtype=float)
+    # Bars before a pair starts stay NaN; carry the last capital through gaps
+    filled = capital.ffill().to_numpy(dtype=float)
+    peak = np.fmax.accumulate(filled, axis=0)
+    depth = peak - filled
+
+    t = np.arange(len(values))[:, None]
+    at_peak = ~(depth > 0)
+    last_peak = np.maximum.accumulate(np.where(at_peak, t, 0), axis=0)
+    duration = (t - last_peak).astype(float)
+
+    missing = np.isnan(values)
+    depth[missing] = np.nan
+    duration[missing] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depth_pct = depth / peak * 100
+
+    frame = lambda data: pd.DataFrame(data, index=capital.index, columns=capital.columns)
+    return {"Drawdown": frame(depth), "Drawdown (%)": frame(depth_pct), "Duration": frame(duration)}
+
+
+def turnover(exposure, capital, unit_notional, window=None):
+    """
+    Traded notional per bar as a fraction of capital, optionally as a rolling sum.
+
+    Exposure is in spread units (one share of ticker A against beta shares of B), so
+    each unit traded moves `price_A + |beta| * price_B` dollars across both legs.
+
+    Args:
+        exposure (pd.DataFrame): (bars x pairs) held exposure
+        capital (pd.DataFrame): (bars x pairs) capital
+        unit_notional (pd.DataFrame): (bars x pairs) dollar notional of one spread unit
+        window (int): If set, sum turnover over this many trailing bars
+
+    Returns:
+        pd.DataFrame: (bars x pairs) turnover
+    """
+    values = exposure.to_numpy(dtype=float)
+    notional = unit_notional.reindex(index=exposure.index, columns=exposure.columns).to_numpy(dtype=float)
+    traded = np.abs(np.diff(values, axis=0, prepend=np.nan)) * notional
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily = traded / capital.to_numpy(dtype=float)
+    if window is not None:
+        missing = np.isnan(daily)
+        daily = _rolling_sums(daily, window)
+        daily[missing] = np.nan
+    return pd.DataFrame(daily, index=exposure.index, columns=exposure.columns)
+
+
+def unit_notional(price_df, legs):
+    """
+    Dollar notional of one spread unit per bar, `price_A + |beta| * price_B`.
+
+    Args:
+        price_df (pd.DataFrame): Aligned close prices
+        legs (dict): Pair name -> (ticker_a, ticker_b, beta)
+
+    Returns:
+        pd.DataFrame: (bars x pairs) notional
+    """
+    return pd.DataFrame({
+        pair: price_df[A] + abs(beta) * price_df[B] for pair, (A, B, beta) in legs.items()
+    })
+
+
+def pair_returns(pnl, capital):
+    """
+    Per-bar return of each pair on its capital before the bar's PnL.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pnl / (capital - pnl)
+
+
+def factor_betas(returns, factor_returns):
+    """
+    Full-sample multi-factor OLS betas of every pair's returns.
+
+    Solves all pairs' normal equations as one batched (pairs x k x k) system,
+    using only the bars on which each pair and all factors are observed.
+
+    Args:
+        returns (pd.DataFrame): (bars x pairs) pair returns
+        factor_returns (pd.DataFrame): (bars x factors) factor returns, e.g. SPY or sector ETFs
+
+    Returns:
+        pd.DataFrame: One row per pair with 'Alpha' and one beta column per factor
+    """
+    factors = factor_returns.reindex(returns.index)
+    X = np.column_stack([np.ones(len(factors)), factors.to_numpy(dtype=float)])
+    Y = returns.to_numpy(dtype=float)
+
+    mask = ~np.isnan(Y) & ~np.isnan(X).any(axis=1, keepdims=True)
+    X = np.where(np.isnan(X), 0.0, X)
+    Y = np.where(mask, Y, 0.0)
+    W = mask.astype(float)
+
+    xtx = np.einsum("tp,tk,tl->pkl", W, X, X)
+    xty = np.einsum("tp,tk->pk", Y, X)
+    # Pairs with too few observations get NaN instead of a singular solve
+    ok = W.sum(axis=0) > X.shape[1]
+    coef = np.full((Y.shape[1], X.shape[1]), np.nan)
+    if ok.any():
+        coef[ok] = np.linalg.solve(xtx[ok], xty[ok][..., None])[..., 0]
+
+    columns = ["Alpha"] + [f"Beta {f}" for f in factor_returns.columns]
+    return pd.DataFrame(coef, index=returns.columns, columns=columns)
+
+
+def rolling_betas(returns, factor_returns, window=63):
+    """
+    Rolling single-factor beta of every pair to each factor.
+
+    Args:
+        returns (pd.DataFrame): (bars x pairs) pair returns
+        factor_returns (pd.DataFrame): (bars x factors) factor returns
+        window (int): Lookback in bars
+
+    Returns:
+        dict: Factor name -> (bars x pairs) beta frame
+    """
+    Y = returns.to_numpy(dtype=float)
+    out = {}
+    for name in factor_returns.columns:
+        x = factor_returns[name].reindex(returns.index).to_numpy(dtype=float)[:, None]
+        mask = ~np.isnan(Y) & ~np.isnan(x)
+        xm = np.where(mask, x, np.nan)
+        ym = np.where(mask, Y, np.nan)
+        # Center on full-sample means for numerical stability (betas are shift-invariant)
+        xm = xm - np.nanmean(xm, axis=0)
+        ym = ym - np.nanmean(ym, axis=0)
+
+        n = _rolling_sums(mask.astype(float), window)
+        sx = _rolling_sums(xm, window)
+        sy = _rolling_sums(ym, window)
+        sxx = _rolling_sums(xm * xm, window)
+        sxy = _rolling_sums(xm * ym, window)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = (sxy - sx * sy / n) / (sxx - sx * sx / n)
+        beta[n < window] = np.nan
+        out[name] = pd.DataFrame(beta, index=returns.index, columns=returns.columns)
+    return out
+
+
+def risk_panels(results_by_pair, factor_returns=None, window=63, periods_per_year=252, notional=None):
+    """
+    All risk series for a universe of pairs, each as one (bars x pairs) frame.
+
+    Args:
+        results_by_pair (dict): Pair name -> backtest_pair results
+        factor_returns (pd.DataFrame): Optional (bars x factors) factor returns
+        window (int): Lookback for rolling statistics, in bars
+        periods_per_year (int): Bars per year for annualization
+        notional (pd.DataFrame): Optional (bars x pairs) dollar notional of one spread
+            unit (see unit_notional); turnover needs it to convert exposure to dollars
+
+    Returns:
+        dict: Series name -> frame ('Rolling Sharpe', 'Drawdown', 'Drawdown (%)',
+        'Duration', 'Turnover' when `notional` is given, and 'Beta <factor>' per factor)
+    """
+    pnl = stack_results(results_by_pair, "PnL")
+    capital = stack_results(results_by_pair, "Capital")
+    exposure = stack_results(results_by_pair, "Exposure")
+
+    panels = {"Rolling Sharpe": rolling_sharpe(pnl, window, periods_per_year)}
+    panels.update(drawdowns(capital))
+    if notional is not None:
+        panels["Turnover"] = turnover(exposure, capital, notional, window)
+
+    if factor_returns is not None:
+        betas = rolling_betas(pair_returns(pnl, capital), factor_returns, window)
+        panels.update({f"Beta {name}": frame for name, frame in betas.items()})
+    return panels
+
+
+def risk_report(results_by_pair, factor_returns=None, window=63, periods_per_year=252, notional=None):
+    """
+    Latest-bar risk snapshot per pair, plus full-sample drawdown and factor statistics.
+
+    See risk_panels for the arguments.
+
+    Returns:
+        pd.DataFrame: One row per pair
+    """
+    panels = risk_panels(results_by_pair, factor_returns, window, periods_per_year, notional)
+
+    # Each pair's most recent observed value
+    report = pd.DataFrame({name: frame.ffill().iloc[-1] for name, frame in panels.items()})
+    report = report.rename(columns={"Turnover": f"Turnover ({window} bars)", "Duration": "Drawdown Duration"})
+    report["Max Drawdown Duration"] = panels["Duration"].max()
+
+    if factor_returns is not None:
+        pnl = stack_results(results_by_pair, "PnL")
+        capital = stack_results(results_by_pair, "Capital")
+        full = factor_betas(pair_returns(pnl, capital), factor_returns)
+        report = report.join(full.add_suffix(" (Full)"))
+
+    report.index.name = "Pair"
+    return report.reset_index()
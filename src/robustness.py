@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+METRIC_NAMES = ["Sharpe Ratio", "Max Drawdown", "Hit Ratio", "CAGR (%)", "Total Return (%)"]
+
+
+def _blocks_to_indices(new_block, starts, n):
+    """
+    Turn block-start flags and random start offsets into resample indices.
+
+    Args:
+        new_block (np.ndarray): (resamples x bars) bool, True where a block begins
+        starts (np.ndarray): (resamples x bars) random start positions
+        n (int): Series length
+
+    Returns:
+        np.ndarray: (resamples x bars) int indices into the original series
+    """
+    t = np.arange(n)
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    rows = np.arange(new_block.shape[0])[:, None]
+    return (starts[rows, block_start] + (t - block_start)) % n
+
+
+def block_bootstrap_indices(n, n_resamples, block_size=20, rng=None):
+    """
+    Moving-block bootstrap: fixed-length blocks with uniformly random starts.
+    """
+    rng = np.random.default_rng(rng)
+    new_block = np.zeros((n_resamples, n), dtype=bool)
+    new_block[:, ::max(int(block_size), 1)] = True
+    starts = rng.integers(0, n, size=(n_resamples, n))
+    return _blocks_to_indices(new_block, starts, n)
+
+
+def stationary_bootstrap_indices(n, n_resamples, block_size=20, rng=None):
+    """
+    Stationary bootstrap (Politis & Romano): geometric block lengths with mean `block_size`.
+    """
+    rng = np.random.default_rng(rng)
+    new_block = rng.random((n_resamples, n)) < 1.0 / max(block_size, 1)
+    new_block[:, 0] = True
+    starts = rng.integers(0, n, size=(n_resamples, n))
+    return _blocks_to_indices(new_block, starts, n)
+
+
+def resampled_metrics(pnl, capital_base, years, idx, periods_per_year=252):
+    """
+    Compute performance metrics for every resampled PnL path at once.
+
+    Args:
+        pnl (np.ndarray): Per-bar PnL of the original backtest
+        capital_base (float): Starting capital
+        years (float): Backtest duration in years, used for CAGR
+        idx (np.ndarray): (resamples x bars) resample indices
+        periods_per_year (int): Bars per year for Sharpe annualization
+
+    Returns:
+        dict: Metric name -> array of length `resamples`
+    """
+    paths = pnl[idx]
+    capital = capital_base + np.cumsum(paths, axis=1)
+
+    std = paths.std(axis=1, ddof=1)
+    mean = paths.mean(axis=1)
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(periods_per_year)
+
+    drawdown = (np.maximum.accumulate(capital, axis=1) - capital).max(axis=1)
+
+    active = (paths != 0).sum(axis=1)
+    hits = (paths > 0).sum(axis=1)
+    hit_ratio = np.divide(hits, active, out=np.zeros(len(hits)), where=active > 0)
+
+    growth = capital[:, -1] / capital_base
+    total_return = (growth - 1) * 100
+    if years > 0:
+        cagr = (np.where(growth > 0, np.abs(growth) ** (1 / years), 0) - 1) * 100
+    else:
+        cagr = np.zeros(len(growth))
+
+    return {
+        "Sharpe Ratio": sharpe,
+        "Max Drawdown": drawdown,
+        "Hit Ratio": hit_ratio,
+        "CAGR (%)": cagr,
+        "Total Return (%)": total_return
+    }
+
+
+def _bootstrap_chunk(pnl, capital_base, years, method, block_size, n_resamples, seed, periods_per_year):
+    """
+    Worker entry point: draw one chunk of resamples and score them.
+    """
+    sampler = block_bootstrap_indices if method == "block" else stationary_bootstrap_indices
+    idx = sampler(len(pnl), n_resamples, block_size, rng=seed)
+    return resampled_metrics(pnl, capital_base, years, idx, periods_per_year)
+
+
+def _backtest_years(results, periods_per_year=252):
+    # Same duration convention as compute_metrics
+    if isinstance(results.index, pd.DatetimeIndex) and len(results) > 1:
+        total_days = (results.index[-1] - results.index[0]).days
+        return total_days / 365.25 if total_days > 0 else 0
+    return len(results) / periods_per_year
+
+
+def _chunk_tasks(pnl, capital_base, years, method, block_size, n_resamples, chunk_size, seed,
+                 periods_per_year=252):
+    chunks = [chunk_size] * (n_resamples // chunk_size)
+    if n_resamples % chunk_size:
+        chunks.append(n_resamples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    return [
+        (pnl, capital_base, years, method, block_size, size, s, periods_per_year)
+        for size, s in zip(chunks, seeds)
+    ]
+
+
+def _summarize(samples, alpha):
+    row = {}
+    for name in METRIC_NAMES:
+        values = np.concatenate([s[name] for s in samples])
+        row[f"{name} Mean"] = round(float(np.mean(values)), 4)
+        row[f"{name} Lo"] = round(float(np.quantile(values, alpha / 2)), 4)
+        row[f"{name} Hi"] = round(float(np.quantile(values, 1 - alpha / 2)), 4)
+    return row
+
+
+def bootstrap_metrics(
+    results,
+    n_resamples=2000,
+    method="stationary",
+    block_size=20,
+    chunk_size=250,
+    alpha=0.05,
+    seed=42,
+    n_jobs=1,
+    periods_per_year=252
+):
+    """
+    Bootstrap confidence intervals for one pair's backtest metrics.
+
+    Resamples are drawn in chunks of `chunk_size` so peak memory is bounded by a
+    (chunk_size x bars) array; chunks are seeded independently, so results do not
+    depend on `n_jobs`.
+
+    Args:
+        results (pd.DataFrame): Output of backtest_pair
+        n_resamples (int): Total number of bootstrap paths
+        method (str): 'stationary' or 'block'
+        block_size (int): (Mean) block length in bars
+        chunk_size (int): Resamples per array computation / worker task
+        alpha (float): Two-sided CI level, e.g. 0.05 for a 95% interval
+        seed (int): Base seed for reproducibility
+        n_jobs (int): Worker processes (1 = in-process)
+        periods_per_year (int): Bars per year for Sharpe annualization
+
+    Returns:
+        dict: '<Metric> Mean', '<Metric> Lo' and '<Metric> Hi' for every metric
+    """
+    if method not in ("stationary", "block"):
+        raise ValueError("Invalid method. Choose from 'stationary' or 'block'.")
+
+    pnl = results["PnL"].fillna(0).to_numpy(dtype=float)
+    capital_base = results["Capital"].iloc[0] - pnl[0]
+    tasks = _chunk_tasks(pnl, capital_base, _backtest_years(results, periods_per_year), method,
+                         block_size, n_resamples, chunk_size, seed, periods_per_year)
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            samples = list(pool.map(_bootstrap_chunk, *zip(*tasks)))
+    else:
+        samples = [_bootstrap_chunk(*task) for task in tasks]
+
+    return _summarize(samples, alpha)
+
+
+def bootstrap_universe(
+    results_by_pair,
+    n_resamples=2000,
+    method="stationary",
+    block_size=20,
+    chunk_size=250,
+    alpha=0.05,
+    seed=42,
+    n_jobs=1,
+    periods_per_year=252
+):
+    """
+    Bootstrap every pair, sharing one process pool across all pairs' chunks.
+
+    Args:
+        results_by_pair (dict): Pair name -> backtest_pair results
+        n_jobs (int): Worker processes (1 = in-process)
+        Remaining options are as in bootstrap_metrics.
+
+    Returns:
+        pd.DataFrame: One row of confidence intervals per pair, with a 'Pair' column
+    """
+    if method not in ("stationary", "block"):
+        raise ValueError("Invalid method. Choose from 'stationary' or 'block'.")
+
+    if n_jobs <= 1:
+        rows = []
+        for pair, results in results_by_pair.items():
+            row = bootstrap_metrics(results, n_resamples, method, block_size, chunk_size, alpha, seed,
+                                    periods_per_year=periods_per_year)
+            row["Pair"] = pair
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    tasks_by_pair = {}
+    for pair, results in results_by_pair.items():
+        pnl = results["PnL"].fillna(0).to_numpy(dtype=float)
+        capital_base = results["Capital"].iloc[0] - pnl[0]
+        tasks_by_pair[pair] = _chunk_tasks(pnl, capital_base, _backtest_years(results, periods_per_year),
+                                           method, block_size, n_resamples, chunk_size, seed,
+                                           periods_per_year)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = {
+            pair: [pool.submit(_bootstrap_chunk, *task) for task in tasks]
+            for pair, tasks in tasks_by_pair.items()
+        }
+        for pair, pair_futures in futures.items():
+            row = _summarize([f.result() for f in pair_futures], alpha)
+            row["Pair"] = pair
+            rows.append(row)
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,290 @@
+import os
+import time
+import uuid
+import asyncio
+import numpy as np
+import pandas as pd
+
+try:
+    from alpaca.trading.client import TradingClient
+    from alpaca.trading.requests import MarketOrderRequest
+    from alpaca.trading.enums import OrderSide, TimeInForce
+except ImportError:
+    TradingClient = None  # Alpaca trading support optional
+
+TERMINAL_STATUSES = {"filled", "canceled", "cancelled", "rejected", "expired"}
+
+
+def net_leg_targets(exposures, legs, shares_per_unit=100, lot_size=1):
+    """
+    Net per-pair spread exposures into one target share position per ticker.
+
+    A long spread unit is +1 share-unit of ticker A and -beta of ticker B, matching
+    spread = A - beta * B in compute_spread.
+
+    Args:
+        exposures (array-like): Target exposure per pair (e.g. the last `Exposure`
+            of each backtest, or LiveSignalEngine.exposure)
+        legs (list of tuples): (ticker_a, ticker_b, beta) per pair, same order
+        shares_per_unit (float): Shares per unit of exposure
+        lot_size (int): Round targets to multiples of this
+
+    Returns:
+        pd.Series: Target shares per ticker
+    """
+    exposures = np.nan_to_num(np.asarray(exposures, dtype=float))
+    tickers = [t for A, B, _ in legs for t in (A, B)]
+    weights = np.array([w for _, _, beta in legs for w in (1.0, -beta)])
+    shares = np.repeat(exposures, 2) * weights * shares_per_unit
+    targets = pd.Series(shares, index=tickers).groupby(level=0, sort=True).sum()
+    return (targets / lot_size).round() * lot_size
+
+
+class MockBroker:
+    """
+    In-process paper broker for offline testing of the router.
+
+    Orders are acknowledged after a random latency and filled at the last known
+    price plus slippage; `fill_ratio` < 1 fills part of each order and cancels the
+    rest, and `reject_rate` rejects a share of them.
+    """
+
+    def __init__(self, prices=None, latency=(0.001, 0.005), slippage_pct=0.0005,
+                 fill_ratio=1.0, reject_rate=0.0, seed=None):
+        self.prices = dict(prices or {})
+        self.latency = latency
+        self.slippage_pct = slippage_pct
+        self.fill_ratio = fill_ratio
+        self.reject_rate = reject_rate
+        self.positions = {}
+        self.orders = {}
+        self._rng = np.random.default_rng(seed)
+
+    def set_prices(self, prices):
+        self.prices.update(prices)
+
+    async def get_positions(self):
+        return dict(self.positions)
+
+    async def submit_order(self, symbol, qty, side, client_order_id):
+        await asyncio.sleep(self._rng.uniform(*self.latency))
+        order_id = uuid.uuid4().hex
+        if symbol not in self.prices or self._rng.random() < self.reject_rate:
+            order = {"id": order_id, "symbol": symbol, "status": "rejected", "filled_qty": 0.0, "filled_avg_price": None}
+        else:
+            filled = np.floor(qty * self.fill_ratio)
+            sign = 1 if side == "buy" else -1
+            price = self.prices[symbol] * (1 + sign * self.slippage_pct)
+            self.positions[symbol] = self.positions.get(symbol, 0.0) + sign * filled
+            order = {
+                "id": order_id,
+                "symbol": symbol,
+                # Unfilled remainder is cancelled, like an immediate-or-cancel order
+                "status": "filled" if filled == qty else "canceled",
+                "filled_qty": float(filled),
+                "filled_avg_price": price if filled else None,
+            }
+        order["client_order_id"] = client_order_id
+        self.orders[order_id] = order
+        return dict(order)
+
+    async def get_order(self, order_id):
+        return dict(self.orders[order_id])
+
+    async def cancel_order(self, order_id):
+        order = self.orders[order_id]
+        if order["status"] not in TERMINAL_STATUSES:
+            order["status"] = "canceled"
+
+
+class AlpacaBroker:
+    """
+    Alpaca paper-trading account behind the router's async broker interface.
+
+    The SDK is synchronous, so calls run in worker threads.
+    """
+
+    def __init__(self, api_key=None, secret_key=None, paper=True):
+        if TradingClient is None:
+            raise ImportError("alpaca-py is required for AlpacaBroker.")
+        self.client = TradingClient(
+            api_key or os.getenv("ALPACA_API_KEY"),
+            secret_key or os.getenv("ALPACA_SECRET_KEY"),
+            paper=paper
+        )
+
+    @staticmethod
+    def _order_dict(order):
+        return {
+            "id": str(order.id),
+            "client_order_id": order.client_order_id,
+            "symbol": order.symbol,
+            "status": str(getattr(order.status, "value", order.status)),
+            "filled_qty": float(order.filled_qty or 0),
+            "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
+        }
+
+    async def get_positions(self):
+        positions = await asyncio.to_thread(self.client.get_all_positions)
+        return {p.symbol: float(p.qty) for p in positions}
+
+    async def submit_order(self, symbol, qty, side, client_order_id):
+        request = MarketOrderRequest(
+            symbol=symbol,
+            qty=qty,
+            side=OrderSide.BUY if side == "buy" else OrderSide.SELL,
+            time_in_force=TimeInForce.DAY,
+            client_order_id=client_order_id
+        )
+        order = await asyncio.to_thread(self.client.submit_order, request)
+        return self._order_dict(order)
+
+    async def get_order(self, order_id):
+        return self._order_dict(await asyncio.to_thread(self.client.get_order_by_id, order_id))
+
+    async def cancel_order(self, order_id):
+        await asyncio.to_thread(self.client.cancel_order_by_id, order_id)
+
+
+class OrderRouter:
+    """
+    Turns target positions into orders: diffs against the broker's current
+    positions, batches one order per ticker per cycle, and submits the batch
+    concurrently (at most `max_concurrency` in flight), tracking fills and latency.
+
+    Only tickers in the trading universe are managed: other holdings in the account
+    are left alone unless `close_unmanaged=True`.
+
+    Brokers implement async get_positions(), submit_order(symbol, qty, side,
+    client_order_id), get_order(order_id) and cancel_order(order_id); see
+    MockBroker and AlpacaBroker.
+    """
+
+    def __init__(self, broker, max_concurrency=8, min_qty=1, fill_timeout=30.0, poll_interval=0.5,
+                 close_unmanaged=False):
+        self.broker = broker
+        self.close_unmanaged = close_unmanaged
+        self.max_concurrency = max_concurrency
+        self.min_qty = min_qty
+        self.fill_timeout = fill_timeout
+        self.poll_interval = poll_interval
+        self.log = []
+        self.cycles = 0
+
+    def plan(self, targets, positions, universe=None):
+        """
+        Orders needed to move `positions` to `targets`.
+
+        Args:
+            targets (dict or pd.Series): Ticker -> target shares
+            positions (dict): Ticker -> current shares, as reported by the broker
+            universe (list): Tickers the router manages (defaults to the targets'
+                tickers); held universe tickers without a target are closed
+
+        Returns:
+            list of dict: symbol, side, qty (positive)
+        """
+        targets = pd.Series(targets, dtype=float)
+        current = pd.Series(positions, dtype=float)
+        managed = targets.index.union(pd.Index(universe if universe is not None else []))
+        if self.close_unmanaged:
+            managed = managed.union(current.index)
+        delta = targets.reindex(managed, fill_value=0.0).sub(current.reindex(managed), fill_value=0.0)
+        delta = delta[delta.abs() >= self.min_qty]
+        return [
+            {"symbol": symbol, "side": "buy" if qty > 0 else "sell", "qty": float(abs(qty))}
+            for symbol, qty in delta.items()
+        ]
+
+    async def _route(self, order, cycle, semaphore):
+        client_order_id = f"statarb-{cycle}-{order['symbol']}-{uuid.uuid4().hex[:8]}"
+        record = {"Cycle": cycle, "Symbol": order["symbol"], "Side": order["side"],
+                  "Qty": order["qty"], "ClientOrderId": client_order_id}
+
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ack = await self.broker.submit_order(order["symbol"], order["qty"], order["side"], client_order_id)
+            except Exception as e:
+                record.update({"Status": "error", "FilledQty": 0.0, "FillPrice": None, "Error": str(e),
+                               "AckLatency": time.perf_counter() - start, "FillLatency": None})
+                return record
+            ack_latency = time.perf_counter() - start
+
+            state = ack
+            error = None
+            try:
+                while state["status"] not in TERMINAL_STATUSES:
+                    if time.perf_counter() - start > self.fill_timeout:
+                        await self.broker.cancel_order(ack["id"])
+                        state = await self.broker.get_order(ack["id"])
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    state = await self.broker.get_order(ack["id"])
+            except Exception as e:
+                # The broker accepted the order; keep its id and last known state
+                error = str(e)
+            done = time.perf_counter() - start
+
+        record.update({
+            "OrderId": ack["id"],
+            "Status": state["status"],
+            "FilledQty": state["filled_qty"],
+            "FillPrice": state["filled_avg_price"],
+            "AckLatency": ack_latency,
+            "FillLatency": done if state["filled_qty"] else None,
+            "Error": error
+        })
+        return record
+
+    async def rebalance(self, targets, universe=None):
+        """
+        Run one routing cycle towards `targets` (ticker -> shares).
+
+        Args:
+            targets (dict or pd.Series): Ticker -> target shares
+            universe (list): Tickers the router manages (see plan)
+
+        Returns:
+            pd.DataFrame: One row per order with status, fills and latencies (seconds)
+        """
+        self.cycles += 1
+        positions = await self.broker.get_positions()
+        orders = self.plan(targets, positions, universe)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes = await asyncio.gather(
+            *(self._route(order, self.cycles, semaphore) for order in orders), return_exceptions=True
+        )
+        records = []
+        for order, outcome in zip(orders, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = {"Cycle": self.cycles, "Symbol": order["symbol"], "Side": order["side"],
+                           "Qty": order["qty"], "Status": "error", "FilledQty": 0.0, "FillPrice": None,
+                           "AckLatency": None, "FillLatency": None, "Error": str(outcome)}
+            records.append(outcome)
+        self.log.extend(records)
+        print(f"[Router] Cycle {self.cycles}: {len(orders)} orders, "
+              f"{sum(r['Status'] == 'filled' for r in records)} filled.")
+        return pd.DataFrame(records)
+
+    def run_cycle(self, targets, universe=None):
+        """
+        Synchronous wrapper around rebalance() for scripts.
+        """
+        return asyncio.run(self.rebalance(targets, universe))
+
+    def latency_stats(self):
+        """
+        Percentiles of acknowledgement and fill latency over all routed orders (ms).
+        """
+        log = pd.DataFrame(self.log)
+        if log.empty:
+            return pd.DataFrame()
+        stats = log[["AckLatency", "FillLatency"]].astype(float).mul(1000).quantile([0.5, 0.95, 0.99])
+        stats.index = ["p50", "p95", "p99"]
+        return stats.round(3)
+
+    def save_log(self, path="logs/orders.csv"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        pd.DataFrame(self.log).to_csv(path, index=False)
+        print(f"[Export] Order log saved to {path}")
@@ -0,0 +1,191 @@
+import math
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr,
+    USPresidentsDay, USMemorialDay, USLaborDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+EXCHANGE_TZ = "America/New_York"
+SESSION_OPEN = "09:30"
+SESSION_CLOSE = "16:00"
+SESSION_MINUTES = 390
+TRADING_DAYS = 252
+
+TIMEFRAME_ALIASES = {"minute": "1min", "hour": "60min", "day": "1D"}
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """
+    Full-day NYSE closures (early closes are treated as regular sessions).
+    """
+    rules = [
+        # NYSE does not close on the Friday before a Saturday New Year's Day
+        Holiday("NewYearsDay", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("IndependenceDay", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+def bar_minutes(freq):
+    """
+    Bar length in minutes for a timeframe ('minute', 'hour', 'day') or pandas offset ('15min', '1h').
+
+    Returns:
+        int or None: Minutes per bar, or None for daily (or longer) bars
+    """
+    freq = TIMEFRAME_ALIASES.get(freq, freq)
+    minutes = pd.to_timedelta(freq).total_seconds() / 60
+    return None if minutes >= 24 * 60 else int(minutes)
+
+
+def bars_per_day(freq):
+    minutes = bar_minutes(freq)
+    return 1 if minutes is None else math.ceil(SESSION_MINUTES / minutes)
+
+
+def periods_per_year(freq):
+    """
+    Annualization factor: number of bars of this size in a trading year.
+    """
+    return TRADING_DAYS * bars_per_day(freq)
+
+
+def window_bars(days, freq):
+    """
+    Convert a lookback in trading days into a bar count for the given bar size.
+    """
+    return max(int(days * bars_per_day(freq)), 2)
+
+
+def validate_bar_size(timeframe, bar_size):
+    """
+    Check that `bar_size` can be built by resampling bars of `timeframe`.
+
+    Raises:
+        ValueError: `bar_size` is daily or longer, shorter than the fetched bars, or
+            not a whole multiple of them
+    """
+    target = bar_minutes(bar_size)
+    if target is None:
+        raise ValueError(f"bar_size must be an intraday size such as '15min', got '{bar_size}'.")
+    base = bar_minutes(timeframe)
+    if target < base or target % base:
+        raise ValueError(
+            f"bar_size '{bar_size}' must be a whole multiple of the fetched '{timeframe}' bars ({base} min)."
+        )
+
+
+def effective_freq(config):
+    """
+    Bar size of the data the pipeline actually loads.
+
+    Only the Alpaca source fetches intraday bars (yfinance is always daily), and
+    `bar_size` only applies when those bars are intraday, mirroring main.py.
+    """
+    timeframe = config.get("timeframe", "day")
+    if config.get("data_source", "yfinance").lower() != "alpaca" or bar_minutes(timeframe) is None:
+        return "day"
+    if config.get("bar_size"):
+        validate_bar_size(timeframe, config["bar_size"])
+        return config["bar_size"]
+    return timeframe
+
+
+def to_exchange_time(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.tz_convert(EXCHANGE_TZ)
+
+
+def session_mask(index):
+    """
+    Vectorized mask of bars that fall inside a regular NYSE session.
+
+    Args:
+        index (pd.DatetimeIndex): Bar timestamps (naive timestamps are treated as UTC)
+
+    Returns:
+        np.ndarray: bool mask, True for in-session bars on trading days
+    """
+    local = to_exchange_time(index)
+    days = local.normalize().tz_localize(None)
+    holidays = NYSEHolidayCalendar().holidays(days.min(), days.max()) if len(days) else []
+
+    trading_day = (local.dayofweek < 5) & ~days.isin(holidays)
+    minute = local.hour * 60 + local.minute
+    open_min = _to_minutes(SESSION_OPEN)
+    close_min = _to_minutes(SESSION_CLOSE)
+    return np.asarray(trading_day & (minute >= open_min) & (minute < close_min))
+
+
+def _to_minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def filter_session(df):
+    """
+    Drop pre/post-market bars and bars on exchange holidays.
+    """
+    return df[session_mask(df.index)]
+
+
+def resample_bars(df, freq, how="last"):
+    """
+    Resample intraday bars to N-minute or hourly bars anchored at the session open.
+
+    Args:
+        df (pd.DataFrame): In-session bars with a DatetimeIndex; either a close panel
+            or an OHLCV frame with open/high/low/close/volume columns
+        freq (str): Target bar size, e.g. '5min', '15min', '60min'
+        how (str): Aggregation for non-OHLCV columns
+
+    Returns:
+        pd.DataFrame: Resampled bars labelled by bar start, empty (overnight) bins dropped
+    """
+    if bar_minutes(freq) is None:
+        raise ValueError("resample_bars handles intraday bar sizes only.")
+
+    ohlcv = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    agg = {col: ohlcv.get(col, how) for col in df.columns}
+
+    local = df.copy()
+    local.index = to_exchange_time(df.index)
+    # Bins start at 09:30 local so hourly bars are 09:30-10:30, not 09:00-10:00
+    bins = local.resample(freq, origin="start_day", offset=SESSION_OPEN.replace(":", "h") + "min",
+                          closed="left", label="left")
+    out = bins.agg(agg)
+    return out[bins.size() > 0]
+
+
+def align_prices(frames, max_gap_bars=5):
+    """
+    Align per-ticker price series onto one bar grid with gap and halt handling.
+
+    Short gaps (missing prints, brief halts) are forward-filled within the same
+    session, never across the overnight break; bars still missing after that
+    (long halts, late listings) are dropped.
+
+    Args:
+        frames (list of pd.Series or pd.DataFrame): Per-ticker prices
+        max_gap_bars (int): Longest gap to forward-fill, in bars
+
+    Returns:
+        pd.DataFrame: Aligned prices, one column per ticker
+    """
+    df = pd.concat(frames, axis=1).sort_index()
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+
+    session_day = to_exchange_time(df.index).normalize()
+    df = df.groupby(np.asarray(session_day)).ffill(limit=max_gap_bars)
+    return df.dropna(axis=0, how="any")
@@ -22,13 +22,26 @@ def compute_spread(series1, series2):
     return pd.Series(spread, index=index), beta
 
 
-def generate_signals(spread, entry_z=1.0, exit_z=0.0):
+def generate_signals(spread, entry_z=1.0, exit_z=0.0, mean=None, std=None, hysteresis=False, initial=0):
     """
     Create long/short signals based on z-score of spread.
+
+    `mean` and `std` default to the spread's own statistics; pass full-sample values
+    to score one chunk of a longer spread consistently. With `hysteresis=True` a
+    position is held from entry (|z| > entry_z) until the z-score reverts through
+    exit_z, instead of only while |z| stays beyond entry_z; `initial` is the state
+    carried in from a previous chunk.
     
     Returns a Series of: 1 (long spread), -1 (short spread), or 0 (neutral)
     """
-    zscore = (spread - np.mean(spread)) / np.std(spread)
+    mean = np.mean(spread) if mean is None else mean
+    std = np.std(spread) if std is None else std
+    zscore = (spread - mean) / std
+
+    if hysteresis:
+        signals = hysteresis_signal_grid(np.asarray(zscore, dtype=float), [(entry_z, exit_z)], initial)[0]
+        return pd.Series(signals.astype(float), index=spread.index)
+
     signals = np.zeros_like(zscore)
 
     # Entry conditions
@@ -39,3 +52,44 @@ def generate_signals(spread, entry_z=1.0, exit_z=0.0):
     signals[np.abs(zscore) < exit_z] = 0
 
     return pd.Series(signals, index=spread.index)
+
+
+def _hold_last(markers, initial):
+    """
+    Forward-fill NaN gaps along axis 1, starting from `initial`.
+    """
+    n = markers.shape[1]
+    markers = np.concatenate([np.full((markers.shape[0], 1), float(initial)), markers], axis=1)
+    last = np.where(np.isnan(markers), 0, np.arange(n + 1))
+    np.maximum.accumulate(last, axis=1, out=last)
+    return markers[np.arange(markers.shape[0])[:, None], last][:, 1:]
+
+
+def hysteresis_signal_grid(zscore, thresholds, initial=0):
+    """
+    Entry/exit state machine evaluated for many threshold settings in one pass.
+
+    Short entries fire at z > entry and hold until z <= exit; long entries fire at
+    z < -entry and hold until z >= -exit. Each side is a forward-filled marker
+    array, so no per-bar loop is needed; the sides are mutually exclusive while
+    exit > -entry.
+
+    Args:
+        zscore (np.ndarray): Z-score per bar
+        thresholds (list of tuples): (entry_z, exit_z) settings to evaluate
+        initial (int): Signal state before the first bar (-1, 0 or 1)
+
+    Returns:
+        np.ndarray: (settings x bars) int8 signals
+    """
+    z = np.asarray(zscore, dtype=float)[None, :]
+    entry = np.array([t[0] for t in thresholds], dtype=float)[:, None]
+    exit_ = np.array([t[1] for t in thresholds], dtype=float)[:, None]
+    if np.any(exit_ <= -entry) or np.any(exit_ >= entry):
+        raise ValueError("Each setting needs -entry_z < exit_z < entry_z.")
+
+    short_markers = np.where(z > entry, -1.0, np.where(z <= exit_, 0.0, np.nan))
+    long_markers = np.where(z < -entry, 1.0, np.where(z >= -exit_, 0.0, np.nan))
+    short = _hold_last(short_markers, min(initial, 0))
+    long = _hold_last(long_markers, max(initial, 0))
+    return (short + long).astype(np.int8)
@@ -42,7 +42,7 @@ if reload_btn:
     feature_rows = []
     all_results = {}
 
-    for A, B, pval in coint_pairs:
+    for A, B, pval, _ in coint_pairs:
         try:
             sA = df[A]
             sB = df[B]
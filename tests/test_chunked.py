@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import backtest_pair, compute_metrics
+from src.chunked import backtest_pair_chunked, run_chunked_backtest, write_price_store
+from src.strategy import compute_spread, generate_signals
+
+
+def _prices(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    base = 100 + np.cumsum(rng.normal(0, 1, n))
+    noise = np.zeros(n)
+    for t in range(1, n):
+        noise[t] = 0.8 * noise[t - 1] + rng.normal(0, 1)
+    index = pd.bdate_range("2020-01-01", periods=n, name="Date")
+    return pd.DataFrame({"A": 1.2 * base + noise + 50, "B": base}, index=index)
+
+
+@pytest.mark.parametrize("store", ["prices.csv", "prices.npy"])
+@pytest.mark.parametrize("chunk_size", [7, 64, 1000])
+def test_chunked_matches_in_memory(tmp_path, store, chunk_size):
+    prices = _prices()
+    path = str(tmp_path / store)
+    write_price_store(prices, path)
+
+    spread, beta = compute_spread(prices["A"], prices["B"])
+    signals = generate_signals(spread, entry_z=1.0, exit_z=0.0)
+    expected = backtest_pair(prices["A"], prices["B"], signals, beta, window=20)
+    chunked = pd.concat(backtest_pair_chunked(path, "A", "B", chunk_size=chunk_size, window=20))
+
+    assert len(chunked) == len(expected)
+    for column in ["Spread", "ZScore", "Signal", "PositionSize", "Exposure", "PnL", "Capital"]:
+        np.testing.assert_allclose(chunked[column].to_numpy(dtype=float),
+                                   expected[column].to_numpy(dtype=float), rtol=1e-6, atol=1e-6)
+    assert chunked["Event"].fillna("").tolist() == expected["Event"].fillna("").tolist()
+
+
+def test_chunked_rejects_exit_rules(tmp_path):
+    path = str(tmp_path / "prices.csv")
+    write_price_store(_prices(), path)
+    with pytest.raises(ValueError):
+        next(backtest_pair_chunked(path, "A", "B", trailing_stop_pct=0.01))
+
+
+def test_run_chunked_backtest_streams_metrics_and_logs(tmp_path):
+    prices = _prices()
+    path = str(tmp_path / "prices.npy")
+    write_price_store(prices, path)
+
+    spread, beta = compute_spread(prices["A"], prices["B"])
+    expected = backtest_pair(prices["A"], prices["B"], generate_signals(spread), beta, window=20)
+    metrics = run_chunked_backtest(path, "A", "B", output_dir=str(tmp_path / "results"),
+                                   log_dir=str(tmp_path / "logs"), chunk_size=64, window=20)
+
+    assert metrics == pytest.approx(compute_metrics(expected))
+    trades = pd.read_csv(tmp_path / "logs" / "A_B_trades.csv", index_col=0)
+    assert trades["Event"].tolist() == expected["Event"].dropna().tolist()